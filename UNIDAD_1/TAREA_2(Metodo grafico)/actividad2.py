@@ -1,44 +1,203 @@
 #ACTIVIDAD 2 (SISTEMA DE ECUACIONES)
-print("Maximizar: z = a*x + b*y")
-a = float(input("Ingresa el valor de a (coeficiente de x): "))
-b = float(input("Ingresa el valor de b (coeficiente de y): "))
-print("\nRestricciones:")
-c = float(input("Ingresa el valor para la restricción x + y ≤ c: "))
-x_max = float(input("Ingresa el valor máximo para x (x ≤ ?): "))
-y_max = float(input("Ingresa el valor máximo para y (y ≤ ?): "))
-x_vals = np.linspace(0, x_max + 2, 400)
-y1 = c - x_vals
-y2 = y_max * np.ones_like(x_vals)
-y_region = np.minimum(y1, y2)
-x_region = np.clip(x_vals, 0, x_max)
-plt.figure(figsize=(8, 6))
-plt.plot(x_vals, y1, label='x + y ≤ ' + str(c))
-plt.axvline(x=x_max, color='red', linestyle='--', label='x ≤ ' + str(x_max))
-plt.axhline(y=y_max, color='green', linestyle='--', label='y ≤ ' + str(y_max))
-plt.fill_between(x_region, 0, y_region, color='skyblue', alpha=0.5, label='Región factible')
-vertices = [(0, 0), (0, min(y_max, c)), (min(x_max, c), 0)]
-if x_max + y_max <= c:
-    vertices.append((x_max, y_max))
-else:
-    intersec = c - x_max
-    if 0 <= intersec <= y_max:
-        vertices.append((x_max, intersec))
-    intersec2 = c - y_max
-    if 0 <= intersec2 <= x_max:
-        vertices.append((intersec2, y_max))
-z_vals = []
-print("\nEvaluación de z = a*x + b*y en los vértices:")
-for v in vertices:
-    z = a * v[0] + b * v[1]
-    z_vals.append((z, v))
-    print(f"z = {a}{v[0]} + {b}{v[1]} = {z}")
-z_max, punto = max(z_vals)
-plt.plot(punto[0], punto[1], 'ro', label=f'Máximo z={z_max} en {punto}')
-plt.xlim(0, x_max + 2)
-plt.ylim(0, y_max + 2)
-plt.xlabel("x (Horas de estudio en casa)")
-plt.ylabel("y (Horas de clase)")
-plt.title("Método gráfico - Optimización Lineal")
-plt.grid(True)
-plt.legend()
-plt.show()
\ No newline at end of file
+"""Método gráfico para max z = a*x + b*y con x + y ≤ c, 0 ≤ x ≤ x_max, 0 ≤ y ≤ y_max
+
+Uso:
+    python actividad2.py                              # modo interactivo
+    python actividad2.py problemas.csv                # una línea JSON por problema en stdout
+    python actividad2.py problemas.jsonl --graficos graficos/ --procesos 4
+    cat problemas.csv | python actividad2.py - --entrada csv
+
+CSV: columnas a,b,c,x_max,y_max (con o sin encabezado). JSONL: un objeto con
+esas claves o una lista de 5 números por línea.
+"""
+import argparse
+import contextlib
+import csv
+import json
+import math
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+PARAMETROS = ('a', 'b', 'c', 'x_max', 'y_max')
+# Figure del proceso actual, reutilizada entre gráficos del modo por lotes
+_figura = None
+
+
+def resolver(a, b, c, x_max, y_max):
+    """Vértices de la región factible y máximo de z: (z_max, punto, z_vals)"""
+    vertices = [(0, 0), (0, min(y_max, c)), (min(x_max, c), 0)]
+    if x_max + y_max <= c:
+        vertices.append((x_max, y_max))
+    else:
+        intersec = c - x_max
+        if 0 <= intersec <= y_max:
+            vertices.append((x_max, intersec))
+        intersec2 = c - y_max
+        if 0 <= intersec2 <= x_max:
+            vertices.append((intersec2, y_max))
+    z_vals = []
+    for v in vertices:
+        z = a * v[0] + b * v[1]
+        z_vals.append((z, v))
+    z_max, punto = max(z_vals)
+    return z_max, punto, z_vals
+
+
+def dibujar(ax, a, b, c, x_max, y_max, z_max, punto):
+    x_vals = np.linspace(0, x_max + 2, 400)
+    y1 = c - x_vals
+    y2 = y_max * np.ones_like(x_vals)
+    y_region = np.minimum(y1, y2)
+    x_region = np.clip(x_vals, 0, x_max)
+    ax.plot(x_vals, y1, label='x + y ≤ ' + str(c))
+    ax.axvline(x=x_max, color='red', linestyle='--', label='x ≤ ' + str(x_max))
+    ax.axhline(y=y_max, color='green', linestyle='--', label='y ≤ ' + str(y_max))
+    ax.fill_between(x_region, 0, y_region, color='skyblue', alpha=0.5, label='Región factible')
+    ax.plot(punto[0], punto[1], 'ro', label=f'Máximo z={z_max} en {punto}')
+    ax.set_xlim(0, x_max + 2)
+    ax.set_ylim(0, y_max + 2)
+    ax.set_xlabel("x (Horas de estudio en casa)")
+    ax.set_ylabel("y (Horas de clase)")
+    ax.set_title("Método gráfico - Optimización Lineal")
+    ax.grid(True)
+    ax.legend()
+
+
+def modo_interactivo():
+    # pyplot solo aquí: el modo por lotes no necesita una ventana
+    import matplotlib.pyplot as plt
+
+    print("Maximizar: z = a*x + b*y")
+    a = float(input("Ingresa el valor de a (coeficiente de x): "))
+    b = float(input("Ingresa el valor de b (coeficiente de y): "))
+    print("\nRestricciones:")
+    c = float(input("Ingresa el valor para la restricción x + y ≤ c: "))
+    x_max = float(input("Ingresa el valor máximo para x (x ≤ ?): "))
+    y_max = float(input("Ingresa el valor máximo para y (y ≤ ?): "))
+    z_max, punto, z_vals = resolver(a, b, c, x_max, y_max)
+    print("\nEvaluación de z = a*x + b*y en los vértices:")
+    for z, v in z_vals:
+        print(f"z = {a}{v[0]} + {b}{v[1]} = {z}")
+    plt.figure(figsize=(8, 6))
+    dibujar(plt.gca(), a, b, c, x_max, y_max, z_max, punto)
+    plt.show()
+
+
+def leer_problemas(archivo, entrada):
+    """Filas (numero_fila, valores o None, error o None) de un CSV o JSONL"""
+    if entrada == 'jsonl':
+        for numero, linea in enumerate(archivo, start=1):
+            if not linea.strip():
+                continue
+            try:
+                datos = json.loads(linea)
+                if isinstance(datos, dict):
+                    faltantes = [nombre for nombre in PARAMETROS if nombre not in datos]
+                    if len(faltantes) == 1:
+                        raise ValueError(f"Falta el parámetro {faltantes[0]}")
+                    if faltantes:
+                        raise ValueError(f"Faltan los parámetros {', '.join(faltantes)}")
+                    datos = [datos[nombre] for nombre in PARAMETROS]
+                yield numero, _validar(datos), None
+            except (TypeError, ValueError) as e:
+                yield numero, None, str(e)
+        return
+
+    lector = csv.reader(archivo)
+    columnas = list(range(5))
+    primera = True
+    for numero, fila in enumerate(lector, start=1):
+        if not fila or not any(celda.strip() for celda in fila):
+            continue
+        # El encabezado es la primera fila no vacía, aunque haya líneas en blanco antes
+        es_primera, primera = primera, False
+        if es_primera and set(PARAMETROS) <= {celda.strip() for celda in fila}:
+            encabezado = [celda.strip() for celda in fila]
+            columnas = [encabezado.index(nombre) for nombre in PARAMETROS]
+            continue
+        try:
+            yield numero, _validar([fila[i] for i in columnas]), None
+        except (IndexError, ValueError) as e:
+            yield numero, None, str(e)
+
+
+def _validar(valores):
+    if len(valores) != 5:
+        raise ValueError("Se esperaban 5 valores: a, b, c, x_max, y_max")
+    valores = [float(valor) for valor in valores]
+    if not all(math.isfinite(valor) for valor in valores):
+        raise ValueError("Los parámetros deben ser números finitos")
+    return valores
+
+
+def guardar_grafico(tarea):
+    """Dibujar un problema sin pyplot (backend Agg) y guardarlo en ruta"""
+    global _figura
+    ruta, valores, z_max, punto = tarea
+    if _figura is None:
+        _figura = Figure(figsize=(8, 6))
+        FigureCanvasAgg(_figura)
+    try:
+        dibujar(_figura.add_subplot(), *valores, z_max, punto)
+        _figura.savefig(ruta)
+    finally:
+        _figura.clf()
+    return ruta
+
+
+def modo_lotes(args):
+    if args.entrada is None:
+        args.entrada = 'jsonl' if os.path.splitext(args.problemas)[1] in ('.jsonl', '.ndjson') else 'csv'
+    archivo = sys.stdin if args.problemas == '-' else open(args.problemas, encoding='utf-8', newline='')
+    if args.graficos:
+        os.makedirs(args.graficos, exist_ok=True)
+
+    errores = 0
+    graficos = []
+    with ProcessPoolExecutor(max_workers=args.procesos) if args.graficos else contextlib.nullcontext() as pool:
+        try:
+            for numero, valores, error in leer_problemas(archivo, args.entrada):
+                if error is not None:
+                    errores += 1
+                    salida = {'fila': numero, 'error': error}
+                else:
+                    z_max, punto, z_vals = resolver(*valores)
+                    salida = {'fila': numero, **dict(zip(PARAMETROS, valores)), 'z': z_max,
+                              'punto': list(punto), 'vertices': [list(v) for _, v in z_vals]}
+                    if args.graficos:
+                        # El dibujo va al pool; la línea de resultado sale sin esperarlo
+                        ruta = os.path.join(args.graficos, f"problema_{numero:05d}.{args.formato_grafico}")
+                        graficos.append(pool.submit(guardar_grafico, (ruta, valores, z_max, punto)))
+                        salida['grafico'] = ruta
+                print(json.dumps(salida, ensure_ascii=False), flush=True)
+        finally:
+            if archivo is not sys.stdin:
+                archivo.close()
+
+        for futuro in graficos:
+            if futuro.exception() is not None:
+                errores += 1
+                print(f"No se pudo guardar un gráfico: {futuro.exception()}", file=sys.stderr)
+    return 1 if errores else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('problemas', help="archivo CSV o JSONL, o '-' para leer de stdin")
+    parser.add_argument('--entrada', choices=('csv', 'jsonl'),
+                        help="formato de entrada; por defecto, según la extensión (stdin: csv)")
+    parser.add_argument('--graficos', help="carpeta donde guardar un gráfico por problema")
+    parser.add_argument('--formato-grafico', choices=('png', 'svg'), default='png')
+    parser.add_argument('--procesos', type=int, help="procesos para los gráficos (por defecto, uno por CPU)")
+    return modo_lotes(parser.parse_args())
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        sys.exit(main())
+    modo_interactivo()
@@ -1,12 +1,24 @@
-from flask import Flask, render_template, request
+from flask import Blueprint, Flask, Response, abort, current_app, jsonify, render_template, request
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
-import io
-import base64
+from barrido import INFACTIBLE, NOMBRES, barrer, barrido_a_json, barrido_a_url, barrido_de_url
+from metodo_grafico import (leer_restricciones, normalizar_parametros, normalizar_restricciones, resolver_lote,
+                            restricciones_pagina)
+from motor_lp import matriz_desde_json, resolver_lp
+from semiplanos import resolver_region
+from render import (FORMATOS, MAX_SEGMENTO_URL, etag, grafico_en_linea, parametros_a_url, parametros_de_url,
+                    precalentar, renderizar_barrido, renderizar_grafico)
 
-app = Flask(__name__)
+bp = Blueprint('lp', __name__)
 
-@app.route('/', methods=['GET', 'POST'])
+PARAMETROS = ('a', 'b', 'c', 'x_max', 'y_max')
+# Filas máximas por petición a /api/solve/batch
+MAX_LOTE = 100000
+METODOS_LP = ('highs', 'highs-ds', 'highs-ipm')
+# Cortes que se listan en la página de barrido (la API los devuelve todos)
+MAX_CORTES_PAGINA = 50
+
+@bp.route('/', methods=['GET', 'POST'])
 def index():
     if request.method == 'POST':
         try:
@@ -15,53 +27,21 @@ def index():
             c = float(request.form['c'])
             x_max = float(request.form['x_max'])
             y_max = float(request.form['y_max'])
+            extras = leer_restricciones(request.form.get('restricciones', ''))
+
+            # Región y óptimo exactos por intersección de semiplanos; el gráfico de
+            # /plot/<parametros>.<formato> usa el mismo cálculo
+            resultado = resolver_region(restricciones_pagina(c, x_max, y_max, extras), (a, b))
+            if resultado['estado'] != 'optimo':
+                return render_template('index.html', error=f"El modelo no tiene óptimo: región {resultado['estado']}")
+            parametros = parametros_a_url(a, b, c, x_max, y_max, extras)
+            if len(parametros) > MAX_SEGMENTO_URL:
+                # Cientos de restricciones no caben en la URL: la imagen va dentro de la página
+                imagenes = {formato: grafico_en_linea(a, b, c, x_max, y_max, formato=formato, extras=extras)
+                            for formato in FORMATOS}
+                return render_template('resultado.html', imagenes=imagenes, resultado=resultado)
 
-            # Preparar los datos para graficar
-            x_vals = np.linspace(0, x_max + 2, 400)
-            y1 = c - x_vals
-            y2 = y_max * np.ones_like(x_vals)
-            y_region = np.minimum(y1, y2)
-            x_region = np.clip(x_vals, 0, x_max)
-
-            vertices = [(0, 0), (0, min(y_max, c)), (min(x_max, c), 0)]
-            if x_max + y_max <= c:
-                vertices.append((x_max, y_max))
-            else:
-                intersec = c - x_max
-                if 0 <= intersec <= y_max:
-                    vertices.append((x_max, intersec))
-                intersec2 = c - y_max
-                if 0 <= intersec2 <= x_max:
-                    vertices.append((intersec2, y_max))
-
-            z_vals = []
-            for v in vertices:
-                z = a * v[0] + b * v[1]
-                z_vals.append((z, v))
-            z_max, punto = max(z_vals)
-
-            # Crear gráfico
-            fig, ax = plt.subplots(figsize=(8,6))
-            ax.plot(x_vals, y1, label=f'x + y ≤ {c}')
-            ax.axvline(x=x_max, color='red', linestyle='--', label=f'x ≤ {x_max}')
-            ax.axhline(y=y_max, color='green', linestyle='--', label=f'y ≤ {y_max}')
-            ax.fill_between(x_region, 0, y_region, color='skyblue', alpha=0.5)
-            ax.plot(punto[0], punto[1], 'ro', label=f'Máximo z={z_max} en {punto}')
-            ax.set_xlim(0, x_max + 2)
-            ax.set_ylim(0, y_max + 2)
-            ax.set_xlabel('x (Horas de estudio en casa)')
-            ax.set_ylabel('y (Horas de clase)')
-            ax.set_title('Método gráfico - Optimización Lineal')
-            ax.grid(True)
-            ax.legend()
-
-            # Guardar imagen en memoria
-            img = io.BytesIO()
-            plt.savefig(img, format='png')
-            img.seek(0)
-            plot_url = base64.b64encode(img.getvalue()).decode()
-
-            return render_template('resultado.html', plot_url=plot_url)
+            return render_template('resultado.html', parametros=parametros, resultado=resultado)
 
         except Exception as e:
             error = f"Error en el cálculo: {e}"
@@ -69,5 +49,230 @@ def index():
 
     return render_template('index.html')
 
+@bp.route('/plot/<parametros>.<any(png, svg):formato>')
+def plot(parametros, formato):
+    try:
+        valores, extras = parametros_de_url(parametros)
+    except ValueError:
+        abort(400)
+
+    # La imagen depende solo de los parámetros: se puede cachear para siempre
+    etiqueta = etag(valores, formato, extras)
+    if etiqueta in request.if_none_match:
+        respuesta = Response(status=304)
+    else:
+        respuesta = Response(renderizar_grafico(*valores, formato=formato, extras=extras),
+                             mimetype=FORMATOS[formato])
+    respuesta.set_etag(etiqueta)
+    respuesta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return respuesta
+
+@bp.route('/barrido', methods=['GET', 'POST'])
+def barrido():
+    """Barrido de uno o dos parámetros en una sola petición, en lugar de reenviar el formulario"""
+    if request.method == 'POST':
+        try:
+            rangos = [(request.form[f'parametro{k}'], request.form[f'inicio{k}'],
+                       request.form[f'fin{k}'], request.form[f'pasos{k}'])
+                      for k in (1, 2) if request.form.get(f'parametro{k}')]
+            # Los parámetros barridos pueden dejarse vacíos
+            barridos = {nombre for nombre, *_ in rangos}
+            base = [float(request.form.get(nombre) or 0) if nombre in barridos else float(request.form[nombre])
+                    for nombre in PARAMETROS]
+            resultado = barrer(base, rangos)
+            segmento = barrido_a_url(base, rangos)
+            return render_template('barrido.html', nombres=NOMBRES, segmento=segmento,
+                                   cortes=resultado['cortes'][:MAX_CORTES_PAGINA],
+                                   total_cortes=len(resultado['cortes']),
+                                   infactibles=int((resultado['base'] == INFACTIBLE).sum()))
+        except Exception as e:
+            return render_template('barrido.html', nombres=NOMBRES, error=f"Error en el barrido: {e}")
+
+    return render_template('barrido.html', nombres=NOMBRES)
+
+@bp.route('/barrido/<segmento>.<any(png, svg):formato>')
+def barrido_grafico(segmento, formato):
+    try:
+        base, rangos = barrido_de_url(segmento)
+    except ValueError:
+        abort(400)
+
+    etiqueta = etag(base, formato, rangos)
+    if etiqueta in request.if_none_match:
+        respuesta = Response(status=304)
+    else:
+        respuesta = Response(renderizar_barrido(base, rangos, formato=formato), mimetype=FORMATOS[formato])
+    respuesta.set_etag(etiqueta)
+    respuesta.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return respuesta
+
+def _error_json(mensaje, estado=400):
+    return jsonify({'error': mensaje}), estado
+
+@bp.route('/api/solve', methods=['GET', 'POST'])
+def api_solve():
+    """Vértices, valores de z y óptimo de un problema, sin gráfico
+
+    Usa resolver_region, como la página: mismos vértices, óptimo y estado.
+    """
+    datos = request.get_json(silent=True) if request.method == 'POST' else request.args
+    try:
+        a, b, c, x_max, y_max = normalizar_parametros(*(datos[nombre] for nombre in PARAMETROS))
+    except (KeyError, TypeError, ValueError):
+        return _error_json(f"Se requieren los parámetros numéricos {', '.join(PARAMETROS)}")
+
+    resultado = resolver_region(restricciones_pagina(c, x_max, y_max), (a, b))
+    if resultado['estado'] != 'optimo':
+        return jsonify({'error': f"El modelo no tiene óptimo: región {resultado['estado']}",
+                        'estado': resultado['estado']}), 422
+    return jsonify({
+        'parametros': dict(zip(PARAMETROS, (a, b, c, x_max, y_max))),
+        'estado': resultado['estado'],
+        'vertices': resultado['vertices'],
+        'valores_z': [a * x + b * y for x, y in resultado['vertices']],
+        'optimo': {'punto': resultado['punto'], 'z': resultado['z']},
+        'activas': resultado['activas']
+    })
+
+@bp.route('/api/solve/batch', methods=['POST'])
+def api_solve_batch():
+    """Óptimo de muchos problemas a la vez: {"problemas": [[a, b, c, x_max, y_max], ...]}
+
+    Las filas también pueden ser objetos con las claves a, b, c, x_max, y_max.
+    """
+    datos = request.get_json(silent=True)
+    filas = datos.get('problemas') if isinstance(datos, dict) else None
+    if not isinstance(filas, list):
+        return _error_json("Se esperaba un objeto JSON con la lista 'problemas'")
+    if len(filas) > MAX_LOTE:
+        return _error_json(f"Como máximo {MAX_LOTE} problemas por petición", 413)
+    try:
+        filas = [[fila[nombre] for nombre in PARAMETROS] if isinstance(fila, dict) else fila
+                 for fila in filas]
+        z_max, x, y = resolver_lote(filas or np.empty((0, 5)))
+    except (KeyError, TypeError, ValueError) as e:
+        return _error_json(f"Problemas inválidos: {e}")
+
+    # Filas con región vacía: z y punto null (NaN no es JSON válido)
+    factibles = ~np.isnan(z_max)
+    return jsonify({
+        'n': len(z_max),
+        'z': [z if factible else None for z, factible in zip(z_max.tolist(), factibles.tolist())],
+        'punto': [[px, py] if factible else None
+                  for px, py, factible in zip(x.tolist(), y.tolist(), factibles.tolist())]
+    })
+
+@bp.route('/api/sweep', methods=['POST'])
+def api_sweep():
+    """Barrido paramétrico: {"parametros": {"a": ..., ...}, "barrer": {"c": [inicio, fin, pasos]}}
+
+    "barrer" admite uno o dos parámetros; la malla completa se resuelve en una pasada.
+    """
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict) or not isinstance(datos.get('parametros'), dict) \
+            or not isinstance(datos.get('barrer'), dict):
+        return _error_json("Se esperaba un objeto JSON con 'parametros' y 'barrer'")
+    try:
+        base = [datos['parametros'].get(nombre, 0) if nombre in datos['barrer'] else datos['parametros'][nombre]
+                for nombre in PARAMETROS]
+        rangos = [(nombre, *valores) for nombre, valores in datos['barrer'].items()]
+        resultado = barrer(base, rangos)
+    except (KeyError, TypeError, ValueError) as e:
+        return _error_json(f"Barrido inválido: {e}")
+    return jsonify(barrido_a_json(resultado))
+
+@bp.route('/api/region', methods=['POST'])
+def api_region():
+    """Región factible 2-D y máximo: {"restricciones": [[a1, a2, b], ...], "objetivo": [a, b]}
+
+    Cada restricción significa a1·x + a2·y ≤ b; las cotas de x e y van como restricciones.
+    """
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict) or 'restricciones' not in datos:
+        return _error_json("Se esperaba un objeto JSON con la lista 'restricciones'")
+    try:
+        restricciones = normalizar_restricciones(datos['restricciones'])
+        a, b = (float(valor) for valor in datos.get('objetivo', [0, 0]))
+        if not np.isfinite([a, b]).all():
+            raise ValueError("El objetivo debe tener coeficientes finitos")
+    except (TypeError, ValueError) as e:
+        return _error_json(f"Modelo inválido: {e}")
+    return jsonify(resolver_region(restricciones, (a, b)))
+
+@bp.route('/api/lp', methods=['POST'])
+def api_lp():
+    """Programa lineal general: {"c": [...], "A_ub": ..., "b_ub": [...], "A_eq": ..., "b_eq": [...],
+    "limites": [inf, sup] o [[inf, sup], ...], "maximizar": false, "metodo": "highs"}
+
+    Las matrices pueden ser listas de filas o {"filas", "columnas", "valores", "forma"}.
+    """
+    datos = request.get_json(silent=True)
+    if not isinstance(datos, dict) or 'c' not in datos:
+        return _error_json("Se esperaba un objeto JSON con al menos 'c'")
+    if datos.get('metodo', 'highs') not in METODOS_LP:
+        return _error_json(f"Método no soportado; use uno de {', '.join(METODOS_LP)}")
+    try:
+        # [inf, sup] aplica a todas las variables; [[inf, sup], ...] es por variable
+        limites = datos.get('limites', [0, None])
+        if len(limites) == 2 and not isinstance(limites[0], list):
+            limites = tuple(limites)
+        resultado = resolver_lp(
+            datos['c'],
+            A_ub=matriz_desde_json(datos.get('A_ub')), b_ub=datos.get('b_ub'),
+            A_eq=matriz_desde_json(datos.get('A_eq')), b_eq=datos.get('b_eq'),
+            limites=limites,
+            maximizar=bool(datos.get('maximizar', False)),
+            metodo=datos.get('metodo', 'highs')
+        )
+    except (KeyError, TypeError, ValueError, IndexError) as e:
+        return _error_json(f"Modelo inválido: {e}")
+    return jsonify(resultado)
+
+@bp.route('/healthz')
+def healthz():
+    """200 solo cuando el worker terminó de precalentar; 503 mientras tanto"""
+    estado = current_app.extensions['precalentamiento']
+    if estado['listo'].is_set():
+        return jsonify({'estado': 'listo'})
+    with estado['candado']:
+        # Dentro del candado: dos /healthz simultáneos no lanzan dos hilos
+        if estado['error'] is None and not estado['listo'].is_set() and not estado['hilo'].is_alive():
+            # El hilo no sobrevive a un fork (p. ej. gunicorn --preload): relanzarlo
+            _iniciar_precalentamiento(estado)
+    return jsonify({'estado': 'precalentando', 'error': estado['error']}), 503
+
+def _precalentar(estado):
+    """Importar y ejercitar numpy, matplotlib y las fuentes antes de atender peticiones"""
+    try:
+        resolver_lote(np.ones((1, 5)))
+        resolver_lp([3.0, 2.0], A_ub=[[1.0, 1.0]], b_ub=[10.0], limites=[(0, 6.0), (0, 8.0)], maximizar=True)
+        resolver_region(restricciones_pagina(10.0, 6.0, 8.0), (3.0, 2.0))
+        precalentar()
+        estado['listo'].set()
+    except Exception as e:
+        estado['error'] = str(e)
+
+def _iniciar_precalentamiento(estado):
+    """Lanzar el hilo de precalentamiento; se llama con estado['candado'] tomado"""
+    estado['hilo'] = threading.Thread(target=_precalentar, args=(estado,), name='precalentamiento', daemon=True)
+    estado['hilo'].start()
+
+def create_app(precalentar_al_iniciar=True):
+    """Fábrica de la aplicación para gunicorn/waitress (ver wsgi.py)
+
+    El precalentamiento corre en segundo plano al crear cada worker;
+    /healthz responde 503 hasta que termina.
+    """
+    app = Flask(__name__)
+    app.register_blueprint(bp)
+    estado = {'listo': threading.Event(), 'error': None, 'hilo': None, 'candado': threading.Lock()}
+    app.extensions['precalentamiento'] = estado
+    if precalentar_al_iniciar:
+        with estado['candado']:
+            _iniciar_precalentamiento(estado)
+    else:
+        estado['listo'].set()
+    return app
+
 if __name__ == '__main__':
-    app.run(debug=True, port=4000)
+    create_app().run(debug=True, port=4000)
@@ -0,0 +1,148 @@
+"""Barrido paramétrico del modelo de la página sobre uno o dos parámetros
+
+Toda la malla de valores se resuelve en una sola pasada vectorizada con
+vertices_optimos_lote. La base óptima de cada punto se identifica por el par
+de restricciones activas en el vértice elegido, y los cortes son los pares de
+puntos vecinos de la malla donde esa base cambia. Los puntos con región vacía
+llevan la base INFACTIBLE, z, x e y NaN, y no generan cortes.
+"""
+import math
+
+import numpy as np
+
+from metodo_grafico import normalizar_parametros, vertices_optimos_lote
+
+NOMBRES = ('a', 'b', 'c', 'x_max', 'y_max')
+# Par de restricciones activas en cada vértice posible de la región
+BASES = ('x=0, y=0', 'x=0, y=y_max', 'x=0, x+y=c', 'x=x_max, y=0', 'x+y=c, y=0',
+         'x=x_max, y=y_max', 'x=x_max, x+y=c', 'x+y=c, y=y_max', 'infactible')
+# Índice en BASES de los puntos sin región factible (c, x_max o y_max negativos)
+INFACTIBLE = len(BASES) - 1
+# Puntos máximos de la malla (igual que MAX_LOTE de /api/solve/batch)
+MAX_PUNTOS = 100000
+
+
+def normalizar_rangos(rangos):
+    """Tupla canónica ((nombre, inicio, fin, pasos), ...) de 1 o 2 parámetros distintos"""
+    normalizados = []
+    for nombre, inicio, fin, pasos in rangos:
+        if nombre not in NOMBRES:
+            raise ValueError(f"Parámetro desconocido: {nombre}; use uno de {', '.join(NOMBRES)}")
+        inicio, fin = float(inicio) + 0.0, float(fin) + 0.0
+        if not (math.isfinite(inicio) and math.isfinite(fin)):
+            raise ValueError("Los extremos del barrido deben ser números finitos")
+        if float(pasos) != int(float(pasos)) or int(float(pasos)) < 2:
+            raise ValueError("Cada barrido necesita un número entero de pasos mayor o igual a 2")
+        normalizados.append((nombre, inicio, fin, int(float(pasos))))
+    if not 1 <= len(normalizados) <= 2:
+        raise ValueError("Se barren uno o dos parámetros")
+    if len({nombre for nombre, *_ in normalizados}) != len(normalizados):
+        raise ValueError("Los parámetros barridos deben ser distintos")
+    if math.prod(pasos for *_, pasos in normalizados) > MAX_PUNTOS:
+        raise ValueError(f"Como máximo {MAX_PUNTOS} puntos por barrido")
+    return tuple(normalizados)
+
+
+def bases_lote(parametros, indice):
+    """Índice en BASES de cada vértice elegido por vertices_optimos_lote"""
+    _, _, c, x_max, y_max = np.asarray(parametros, dtype=np.float64).T
+    base = np.array([0, 1, 3, 5, 6, 7])[indice]
+    # (0, min(y_max, c)) y (min(x_max, c), 0) cambian de base según qué cota domina
+    base += (indice == 1) & (y_max > c)
+    base += (indice == 2) & (x_max > c)
+    base[indice < 0] = INFACTIBLE
+    return base
+
+
+def _cortes(rangos, ejes, base, x, y, z):
+    """Pares de puntos vecinos, a lo largo de cada eje, donde cambia la base óptima
+
+    Solo entre puntos factibles: entrar o salir de la región vacía no es un cambio de base.
+    """
+    cortes = []
+    for eje, (nombre, *_) in enumerate(rangos):
+        antes = tuple(slice(None, -1) if k == eje else slice(None) for k in range(base.ndim))
+        despues = tuple(slice(1, None) if k == eje else slice(None) for k in range(base.ndim))
+        cambia = ((base[antes] != base[despues])
+                  & (base[antes] != INFACTIBLE) & (base[despues] != INFACTIBLE))
+        for posicion in np.argwhere(cambia):
+            i = tuple(posicion)
+            j = tuple(p + 1 if k == eje else p for k, p in enumerate(posicion))
+            cortes.append({
+                'parametro': nombre,
+                'entre': [float(ejes[eje][i[eje]]), float(ejes[eje][j[eje]])],
+                'fijos': {otro: float(ejes[k][i[k]]) for k, (otro, *_) in enumerate(rangos) if k != eje},
+                'antes': {'base': BASES[base[i]], 'punto': [float(x[i]), float(y[i])], 'z': float(z[i])},
+                'despues': {'base': BASES[base[j]], 'punto': [float(x[j]), float(y[j])], 'z': float(z[j])}
+            })
+    return cortes
+
+
+def barrer(base, rangos):
+    """Resolver el modelo en la malla de rangos, con los demás parámetros fijos en base
+
+    base: (a, b, c, x_max, y_max); rangos: [(nombre, inicio, fin, pasos), ...].
+    Devuelve un diccionario con 'ejes' (valores de cada parámetro barrido),
+    arreglos 'z', 'x', 'y' y 'base' con la forma de la malla (índices de
+    BASES; NaN e INFACTIBLE donde la región es vacía) y la lista de 'cortes'.
+    """
+    base = normalizar_parametros(*base)
+    rangos = normalizar_rangos(rangos)
+    ejes = [np.linspace(inicio, fin, pasos) for _, inicio, fin, pasos in rangos]
+    malla = np.meshgrid(*ejes, indexing='ij')
+    forma = malla[0].shape
+
+    parametros = np.tile(np.array(base), (malla[0].size, 1))
+    for (nombre, *_), valores in zip(rangos, malla):
+        parametros[:, NOMBRES.index(nombre)] = valores.ravel()
+    z, x, y, indice = vertices_optimos_lote(parametros)
+    bases = bases_lote(parametros, indice).reshape(forma)
+    z, x, y = z.reshape(forma), x.reshape(forma), y.reshape(forma)
+
+    return {
+        'parametros': dict(zip(NOMBRES, base)),
+        'rangos': rangos,
+        'ejes': ejes,
+        'z': z,
+        'x': x,
+        'y': y,
+        'base': bases,
+        'cortes': _cortes(rangos, ejes, bases, x, y, z)
+    }
+
+
+def _sin_nan(arreglo):
+    """Lista anidada con None en lugar de NaN (NaN no es JSON válido)"""
+    return np.where(np.isnan(arreglo), None, arreglo.astype(object)).tolist()
+
+
+def barrido_a_json(resultado):
+    """Resultado de barrer con listas en lugar de arreglos NumPy"""
+    return {
+        'parametros': resultado['parametros'],
+        'barridos': [nombre for nombre, *_ in resultado['rangos']],
+        'ejes': {nombre: eje.tolist() for (nombre, *_), eje in zip(resultado['rangos'], resultado['ejes'])},
+        'z': _sin_nan(resultado['z']),
+        'x': _sin_nan(resultado['x']),
+        'y': _sin_nan(resultado['y']),
+        'base': resultado['base'].tolist(),
+        'bases': list(BASES),
+        'cortes': resultado['cortes']
+    }
+
+
+def barrido_a_url(base, rangos):
+    """Segmento 'a,b,c,x_max,y_max;nombre,inicio,fin,pasos[;...]' para /barrido/<segmento>.<formato>"""
+    grupos = [[repr(valor) for valor in normalizar_parametros(*base)]]
+    grupos += [[nombre, repr(inicio), repr(fin), str(pasos)] for nombre, inicio, fin, pasos in normalizar_rangos(rangos)]
+    return ';'.join(','.join(grupo) for grupo in grupos)
+
+
+def barrido_de_url(segmento):
+    """Inverso de barrido_a_url: (base, rangos); ValueError si el segmento no es válido"""
+    grupos = [grupo.split(',') for grupo in segmento.split(';')]
+    if len(grupos[0]) != 5:
+        raise ValueError("Se esperaban 5 parámetros: a,b,c,x_max,y_max")
+    if any(len(grupo) != 4 for grupo in grupos[1:]):
+        raise ValueError("Cada barrido lleva 4 valores: nombre,inicio,fin,pasos")
+    return normalizar_parametros(*grupos[0]), normalizar_rangos(grupos[1:])
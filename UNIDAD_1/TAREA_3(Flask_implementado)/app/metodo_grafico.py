@@ -0,0 +1,150 @@
+import math
+import re
+
+import numpy as np
+
+
+def normalizar_parametros(a, b, c, x_max, y_max):
+    """Convertir los parámetros del formulario en una tupla de floats canónica
+
+    Sirve como clave de caché: 3, '3' y 3.0 dan la misma tupla y -0.0 pasa a 0.0.
+    """
+    parametros = tuple(float(valor) + 0.0 for valor in (a, b, c, x_max, y_max))
+    if not all(math.isfinite(valor) for valor in parametros):
+        raise ValueError("Los parámetros deben ser números finitos")
+    return parametros
+
+
+def normalizar_restricciones(restricciones):
+    """Tupla canónica de restricciones (a1, a2, b) que significan a1·x + a2·y ≤ b"""
+    normalizadas = []
+    for restriccion in restricciones:
+        a1, a2, b = (float(valor) + 0.0 for valor in restriccion)
+        if not all(math.isfinite(valor) for valor in (a1, a2, b)):
+            raise ValueError("Las restricciones deben tener coeficientes finitos")
+        normalizadas.append((a1, a2, b))
+    return tuple(normalizadas)
+
+
+def leer_restricciones(texto):
+    """Restricciones del formulario, una por línea: 'a1 a2 b', 'a1 a2 <= b' o 'a1 a2 >= b'
+
+    Los números pueden separarse con espacios o comas; sin operador se asume ≤.
+    """
+    restricciones = []
+    for numero, linea in enumerate((texto or '').splitlines(), start=1):
+        partes = [parte for parte in re.split(r'[\s,]+', linea.strip()) if parte]
+        if not partes:
+            continue
+        operador = '<='
+        if len(partes) == 4 and partes[2] in ('<=', '>=', '≤', '≥'):
+            operador = partes.pop(2)
+        if len(partes) != 3:
+            raise ValueError(f"Restricción inválida en la línea {numero}: {linea.strip()}")
+        a1, a2, b = (float(parte) for parte in partes)
+        if operador in ('>=', '≥'):
+            a1, a2, b = -a1, -a2, -b
+        restricciones.append((a1, a2, b))
+    return normalizar_restricciones(restricciones)
+
+
+def restricciones_pagina(c, x_max, y_max, extras=()):
+    """Modelo de la página como semiplanos: x + y ≤ c, 0 ≤ x ≤ x_max, 0 ≤ y ≤ y_max y extras"""
+    return [(1.0, 1.0, c), (1.0, 0.0, x_max), (-1.0, 0.0, 0.0), (0.0, 1.0, y_max), (0.0, -1.0, 0.0)] + list(extras)
+
+
+def vertices_factibles(c, x_max, y_max):
+    """Vértices candidatos de la región x + y ≤ c, 0 ≤ x ≤ x_max, 0 ≤ y ≤ y_max"""
+    vertices = [(0, 0), (0, min(y_max, c)), (min(x_max, c), 0)]
+    if x_max + y_max <= c:
+        vertices.append((x_max, y_max))
+    else:
+        intersec = c - x_max
+        if 0 <= intersec <= y_max:
+            vertices.append((x_max, intersec))
+        intersec2 = c - y_max
+        if 0 <= intersec2 <= x_max:
+            vertices.append((intersec2, y_max))
+    return vertices
+
+
+def resolver(a, b, c, x_max, y_max):
+    """Maximizar z = a·x + b·y evaluando los vértices
+
+    Devuelve (z_max, punto, z_vals) con z_vals = [(z, vértice), ...]; en caso
+    de empate gana el vértice mayor, como max() sobre las tuplas (z, vértice).
+    """
+    z_vals = []
+    for v in vertices_factibles(c, x_max, y_max):
+        z = a * v[0] + b * v[1]
+        z_vals.append((z, v))
+    z_max, punto = max(z_vals)
+    return z_max, punto, z_vals
+
+
+def _como_lote(parametros):
+    """Validar un arreglo (n, 5) de filas a, b, c, x_max, y_max"""
+    parametros = np.asarray(parametros, dtype=np.float64)
+    if parametros.ndim != 2 or parametros.shape[1] != 5:
+        raise ValueError("Se esperaba un arreglo (n, 5) con a, b, c, x_max, y_max")
+    if not np.isfinite(parametros).all():
+        raise ValueError("Los parámetros deben ser números finitos")
+    return parametros
+
+
+def vertices_lote(parametros):
+    """Los 6 vértices candidatos de vertices_factibles para cada fila, con su máscara
+
+    Devuelve (vx, vy, validos), cada uno de forma (n, 6), en el mismo orden
+    en que vertices_factibles los agrega.
+    """
+    _, _, c, x_max, y_max = _como_lote(parametros).T
+    caja_dentro = x_max + y_max <= c
+    intersec = c - x_max
+    intersec2 = c - y_max
+    cero = np.zeros_like(c)
+    vx = np.stack([cero, cero, np.minimum(x_max, c), x_max, x_max, intersec2], axis=1)
+    vy = np.stack([cero, np.minimum(y_max, c), cero, y_max, intersec, y_max], axis=1)
+    validos = np.stack([
+        np.ones_like(caja_dentro), np.ones_like(caja_dentro), np.ones_like(caja_dentro),
+        caja_dentro,
+        ~caja_dentro & (0 <= intersec) & (intersec <= y_max),
+        ~caja_dentro & (0 <= intersec2) & (intersec2 <= x_max)
+    ], axis=1)
+    return vx, vy, validos
+
+
+def vertices_optimos_lote(parametros):
+    """Como resolver_lote, devolviendo además qué candidato de vertices_lote ganó
+
+    Devuelve (z_max, x, y, indice) de forma (n,), con indice entre 0 y 5. Las
+    filas con región vacía (c, x_max o y_max negativos) dan NaN e indice -1.
+    """
+    parametros = _como_lote(parametros)
+    a, b = parametros[:, 0:1], parametros[:, 1:2]
+    vx, vy, validos = vertices_lote(parametros)
+    z = a * vx + b * vy
+
+    # Comparación lexicográfica (z, x, y) restringida a los vértices válidos
+    candidatos = validos & (z == np.where(validos, z, -np.inf).max(axis=1, keepdims=True))
+    candidatos &= vx == np.where(candidatos, vx, -np.inf).max(axis=1, keepdims=True)
+    candidatos &= vy == np.where(candidatos, vy, -np.inf).max(axis=1, keepdims=True)
+    elegido = np.argmax(candidatos, axis=1)
+
+    filas = np.arange(len(parametros))
+    z_max, x, y = z[filas, elegido], vx[filas, elegido], vy[filas, elegido]
+    infactibles = (parametros[:, 2:] < 0).any(axis=1)
+    z_max[infactibles] = x[infactibles] = y[infactibles] = np.nan
+    elegido[infactibles] = -1
+    return z_max, x, y, elegido
+
+
+def resolver_lote(parametros):
+    """Versión vectorizada de resolver para un arreglo (n, 5) de problemas
+
+    Devuelve (z_max, x, y) de forma (n,). Los empates se rompen igual que
+    max() sobre (z, (x, y)): mayor z, luego mayor x y luego mayor y. Las
+    filas con región vacía dan NaN.
+    """
+    z_max, x, y, _ = vertices_optimos_lote(parametros)
+    return z_max, x, y
@@ -0,0 +1,85 @@
+"""Motor de programación lineal general sobre scipy.optimize.linprog (HiGHS)
+
+    min / max  c·x
+    sujeto a   A_ub x ≤ b_ub,  A_eq x = b_eq,  limites[i][0] ≤ x_i ≤ limites[i][1]
+
+A_ub y A_eq pueden ser densas (listas o arreglos NumPy) o dispersas
+(scipy.sparse), que HiGHS usa sin densificar.
+"""
+import numpy as np
+from scipy import sparse
+from scipy.optimize import linprog
+
+ESTADOS = {0: 'optimo', 1: 'limite_iteraciones', 2: 'infactible', 3: 'no_acotado', 4: 'error_numerico'}
+# Tolerancia para limpiar ruido numérico de HiGHS (3.9999999999 -> 4.0)
+DECIMALES = 9
+
+
+def _matriz(matriz):
+    if matriz is None:
+        return None
+    if sparse.issparse(matriz):
+        return sparse.csr_matrix(matriz, dtype=np.float64)
+    return np.atleast_2d(np.asarray(matriz, dtype=np.float64))
+
+
+def matriz_desde_json(datos):
+    """Matriz densa (lista de filas) o dispersa {'filas', 'columnas', 'valores', 'forma'}"""
+    if datos is None:
+        return None
+    if isinstance(datos, dict):
+        return sparse.csr_matrix(
+            (np.asarray(datos['valores'], dtype=np.float64),
+             (np.asarray(datos['filas'], dtype=np.int64), np.asarray(datos['columnas'], dtype=np.int64))),
+            shape=tuple(datos['forma'])
+        )
+    return _matriz(datos)
+
+
+def _limpiar(valores):
+    return np.round(valores, DECIMALES) + 0.0
+
+
+def resolver_lp(c, A_ub=None, b_ub=None, A_eq=None, b_eq=None, limites=(0, None),
+                maximizar=False, metodo='highs', tiempo_limite=None):
+    """Resolver un programa lineal
+
+    limites: un par (inferior, superior) para todas las variables o una lista
+        de pares; None significa sin cota.
+    metodo: 'highs' (elige solo), 'highs-ds' (símplex dual) o 'highs-ipm'
+        (punto interior).
+
+    Devuelve un diccionario con 'estado' (ver ESTADOS), 'mensaje', 'x',
+    'objetivo', 'holguras' y 'duales' de las restricciones de desigualdad.
+    """
+    c = np.asarray(c, dtype=np.float64).ravel()
+    A_ub, A_eq = _matriz(A_ub), _matriz(A_eq)
+    b_ub = None if b_ub is None else np.asarray(b_ub, dtype=np.float64).ravel()
+    b_eq = None if b_eq is None else np.asarray(b_eq, dtype=np.float64).ravel()
+    for nombre, matriz, lado in (('A_ub', A_ub, b_ub), ('A_eq', A_eq, b_eq)):
+        if (matriz is None) != (lado is None):
+            raise ValueError(f"{nombre} y su lado derecho deben indicarse juntos")
+        if matriz is not None and (matriz.shape[1] != len(c) or matriz.shape[0] != len(lado)):
+            raise ValueError(f"Dimensiones incompatibles en {nombre}: {matriz.shape}")
+
+    opciones = {} if tiempo_limite is None else {'time_limit': tiempo_limite}
+    signo = -1.0 if maximizar else 1.0
+    resultado = linprog(signo * c, A_ub=A_ub, b_ub=b_ub, A_eq=A_eq, b_eq=b_eq,
+                        bounds=limites, method=metodo, options=opciones)
+
+    salida = {
+        'estado': ESTADOS.get(resultado.status, 'error'),
+        'mensaje': resultado.message,
+        'x': None,
+        'objetivo': None,
+        'holguras': None,
+        'duales': None,
+        'iteraciones': int(getattr(resultado, 'nit', 0) or 0)
+    }
+    if resultado.status == 0:
+        salida['x'] = _limpiar(resultado.x).tolist()
+        salida['objetivo'] = float(_limpiar(signo * resultado.fun))
+        if A_ub is not None:
+            salida['holguras'] = _limpiar(resultado.slack).tolist()
+            salida['duales'] = _limpiar(signo * resultado.ineqlin.marginals).tolist()
+    return salida
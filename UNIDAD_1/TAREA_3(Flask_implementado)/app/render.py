@@ -0,0 +1,222 @@
+"""Renderizado del gráfico del método gráfico sin pyplot
+
+Se usa el backend Agg con una Figure por hilo que se reutiliza y se limpia
+después de cada imagen, y las imágenes ya generadas se guardan en una caché
+LRU indexada por los parámetros normalizados.
+"""
+import base64
+import hashlib
+import io
+import threading
+from functools import lru_cache
+
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+from barrido import BASES, INFACTIBLE, barrer, normalizar_rangos
+from metodo_grafico import normalizar_parametros, normalizar_restricciones, restricciones_pagina
+from semiplanos import resolver_region
+
+TAMANO_CACHE = 256
+FORMATOS = {'png': 'image/png', 'svg': 'image/svg+xml'}
+# Cambiar al modificar el dibujo para invalidar las ETag ya publicadas
+VERSION_GRAFICO = 4
+# Largo máximo del segmento de /plot/<parametros>; gunicorn rechaza líneas de
+# petición de más de 4094 bytes (414), así que por encima se dibuja en línea
+MAX_SEGMENTO_URL = 2000
+
+_local = threading.local()
+
+
+def _figura():
+    """Figure propia del hilo actual, creada en el primer uso"""
+    figura = getattr(_local, 'figura', None)
+    if figura is None:
+        figura = Figure(figsize=(8, 6))
+        FigureCanvasAgg(figura)
+        _local.figura = figura
+    return figura
+
+
+def dibujar(ax, a, b, c, x_max, y_max, extras=()):
+    """Dibujar restricciones, región factible exacta y óptimo, ambos calculados por semiplanos"""
+    region = resolver_region(restricciones_pagina(c, x_max, y_max, extras), (a, b))
+
+    x_vals = np.linspace(0, x_max + 2, 400)
+    y1 = c - x_vals
+
+    ax.plot(x_vals, y1, label=f'x + y ≤ {c}')
+    ax.axvline(x=x_max, color='red', linestyle='--', label=f'x ≤ {x_max}')
+    ax.axhline(y=y_max, color='green', linestyle='--', label=f'y ≤ {y_max}')
+    if extras:
+        # Una sola colección aunque haya cientos de restricciones
+        ax.add_collection(LineCollection([_segmento(restriccion, x_max + 2, y_max + 2) for restriccion in extras],
+                                         colors='purple', linestyles=':',
+                                         label=f'{len(extras)} restricciones adicionales'))
+    if region['vertices']:
+        xs, ys = zip(*region['vertices'])
+        ax.fill(xs, ys, color='skyblue', alpha=0.5)
+    if region['estado'] == 'optimo':
+        punto = tuple(region['punto'])
+        ax.plot(punto[0], punto[1], 'ro', label=f"Máximo z={region['z']} en {punto}")
+    ax.set_xlim(0, x_max + 2)
+    ax.set_ylim(0, y_max + 2)
+    ax.set_xlabel('x (Horas de estudio en casa)')
+    ax.set_ylabel('y (Horas de clase)')
+    ax.set_title('Método gráfico - Optimización Lineal')
+    ax.grid(True)
+    ax.legend()
+
+
+def _segmento(restriccion, x_fin, y_fin):
+    """Tramo de la recta a1·x + a2·y = b que cruza la ventana del gráfico"""
+    a1, a2, b = restriccion
+    if a2 == 0:
+        x = b / a1 if a1 else 0.0
+        return [(x, 0.0), (x, y_fin)]
+    return [(0.0, b / a2), (x_fin, (b - a1 * x_fin) / a2)]
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _renderizar(parametros, extras, formato):
+    figura = _figura()
+    try:
+        dibujar(figura.add_subplot(), *parametros, extras=extras)
+        imagen = io.BytesIO()
+        figura.savefig(imagen, format=formato)
+        return imagen.getvalue()
+    finally:
+        # Liberar ejes y artistas aunque falle el dibujo
+        figura.clf()
+
+
+def dibujar_barrido(ax, resultado):
+    """z máximo sobre el barrido: curva por tramos (1 parámetro) o mapa de calor (2)"""
+    rangos, ejes, z, base = resultado['rangos'], resultado['ejes'], resultado['z'], resultado['base']
+    colores = matplotlib.colormaps['tab10']
+    if len(rangos) == 1:
+        eje = ejes[0]
+        # Un tramo por cada racha de la misma base, unido al punto siguiente
+        inicios = np.flatnonzero(np.r_[True, base[1:] != base[:-1]])
+        etiquetadas = set()
+        for inicio, fin in zip(inicios, np.r_[inicios[1:], len(eje)]):
+            tramo = slice(inicio, min(fin + 1, len(eje)))
+            etiqueta = None if base[inicio] in etiquetadas else BASES[base[inicio]]
+            etiquetadas.add(base[inicio])
+            if base[inicio] == INFACTIBLE:
+                # Sin z que dibujar: se sombrea el tramo sin región factible
+                ax.axvspan(eje[inicio], eje[fin - 1], color='lightgray', label=etiqueta)
+                continue
+            ax.plot(eje[tramo], z[tramo], color=colores(base[inicio]), linewidth=2, label=etiqueta)
+        for corte in resultado['cortes']:
+            ax.axvline(x=sum(corte['entre']) / 2, color='gray', linestyle=':')
+        ax.set_xlabel(rangos[0][0])
+        ax.set_ylabel('z máximo')
+        ax.grid(True)
+        ax.legend(title='Base óptima')
+    else:
+        (nombre_x, *_), (nombre_y, *_) = rangos
+        # Los puntos infactibles (NaN) quedan sin color sobre el fondo gris
+        ax.set_facecolor('lightgray')
+        malla = ax.pcolormesh(ejes[0], ejes[1], np.ma.masked_invalid(z.T), shading='auto', cmap='viridis')
+        ax.figure.colorbar(malla, ax=ax, label='z máximo')
+        # Fronteras entre bases: un segmento por cada corte, a mitad de camino entre los dos puntos
+        medios_x, medios_y = np.diff(ejes[0]).mean() / 2, np.diff(ejes[1]).mean() / 2
+        fronteras = []
+        for corte in resultado['cortes']:
+            medio = sum(corte['entre']) / 2
+            if corte['parametro'] == nombre_x:
+                y = corte['fijos'][nombre_y]
+                fronteras.append([(medio, y - medios_y), (medio, y + medios_y)])
+            else:
+                x = corte['fijos'][nombre_x]
+                fronteras.append([(x - medios_x, medio), (x + medios_x, medio)])
+        ax.add_collection(LineCollection(fronteras, colors='white', linewidths=1))
+        for indice in np.unique(base):
+            i, j = np.nonzero(base == indice)
+            if len(i) >= 0.02 * base.size:
+                ax.text(ejes[0][i].mean(), ejes[1][j].mean(), BASES[indice], color='white',
+                        ha='center', va='center', fontsize=8)
+        ax.set_xlabel(nombre_x)
+        ax.set_ylabel(nombre_y)
+    ax.set_title('Barrido paramétrico - Optimización Lineal')
+
+
+@lru_cache(maxsize=TAMANO_CACHE)
+def _renderizar_barrido(base, rangos, formato):
+    figura = _figura()
+    try:
+        dibujar_barrido(figura.add_subplot(), barrer(base, rangos))
+        imagen = io.BytesIO()
+        figura.savefig(imagen, format=formato)
+        return imagen.getvalue()
+    finally:
+        figura.clf()
+
+
+def renderizar_barrido(base, rangos, formato='png'):
+    """Imagen del barrido en bytes ('png' o 'svg'), desde la caché si ya existe"""
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return _renderizar_barrido(normalizar_parametros(*base), normalizar_rangos(rangos), formato)
+
+
+def renderizar_grafico(a, b, c, x_max, y_max, formato='png', extras=()):
+    """Imagen del gráfico en bytes ('png' o 'svg'), desde la caché si ya existe
+
+    extras: restricciones adicionales (a1, a2, b) con a1·x + a2·y ≤ b.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato no soportado: {formato}")
+    return _renderizar(normalizar_parametros(a, b, c, x_max, y_max), normalizar_restricciones(extras), formato)
+
+
+def grafico_en_linea(a, b, c, x_max, y_max, formato='png', extras=()):
+    """URI data: con la imagen del gráfico, para cuando el segmento de URL sería demasiado largo"""
+    imagen = base64.b64encode(renderizar_grafico(a, b, c, x_max, y_max, formato=formato, extras=extras))
+    return f"data:{FORMATOS[formato]};base64,{imagen.decode('ascii')}"
+
+
+def precalentar():
+    """Cargar fuentes y rutas de dibujo de Agg/SVG sin tocar la caché ni la figura del hilo"""
+    figura = Figure(figsize=(8, 6))
+    FigureCanvasAgg(figura)
+    try:
+        dibujar(figura.add_subplot(), 3.0, 2.0, 10.0, 6.0, 8.0)
+        for formato in FORMATOS:
+            figura.savefig(io.BytesIO(), format=formato)
+    finally:
+        figura.clf()
+
+
+def parametros_a_url(a, b, c, x_max, y_max, extras=()):
+    """Segmento de URL canónico 'a,b,c,x_max,y_max[;a1,a2,b...]' para /plot/<parametros>.<formato>"""
+    grupos = [normalizar_parametros(a, b, c, x_max, y_max)] + list(normalizar_restricciones(extras))
+    return ';'.join(','.join(repr(valor) for valor in grupo) for grupo in grupos)
+
+
+def parametros_de_url(segmento):
+    """Inverso de parametros_a_url: (parametros, extras); ValueError si el segmento no es válido"""
+    grupos = [grupo.split(',') for grupo in segmento.split(';')]
+    if len(grupos[0]) != 5:
+        raise ValueError("Se esperaban 5 parámetros: a,b,c,x_max,y_max")
+    if any(len(grupo) != 3 for grupo in grupos[1:]):
+        raise ValueError("Cada restricción adicional lleva 3 valores: a1,a2,b")
+    return normalizar_parametros(*grupos[0]), normalizar_restricciones(grupos[1:])
+
+
+def etag(parametros, formato, extras=()):
+    """ETag fuerte derivada del hash de los parámetros normalizados, el formato y los
+    grupos adicionales (restricciones o rangos de barrido)"""
+    grupos = [parametros] + list(extras)
+    clave = f"{VERSION_GRAFICO}|{formato}|{';'.join(','.join(repr(valor) for valor in grupo) for grupo in grupos)}"
+    return hashlib.sha256(clave.encode('utf-8')).hexdigest()[:32]
+
+
+def info_cache():
+    """Aciertos, fallos y tamaño de la caché de imágenes del gráfico"""
+    return _renderizar.cache_info()
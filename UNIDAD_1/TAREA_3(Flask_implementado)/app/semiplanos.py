@@ -0,0 +1,130 @@
+"""Intersección de semiplanos a1·x + a2·y ≤ b en O(m log m)
+
+Se ordenan los semiplanos por el ángulo de su recta y se recorren con una
+deque, descartando los que quedan redundantes. Se agrega una caja de lado
+2·LIMITE: si alguna de sus aristas forma parte del polígono, la región es no
+acotada en esa dirección.
+"""
+import math
+from collections import deque
+
+EPS = 1e-9
+LIMITE = 1e9
+DECIMALES = 9
+
+
+class _Semiplano:
+    """Recta p + t·d con la región factible a su izquierda (coeficientes normalizados)"""
+    __slots__ = ('angulo', 'px', 'py', 'dx', 'dy', 'indice')
+
+    def __init__(self, a1, a2, b, indice):
+        norma = math.hypot(a1, a2)
+        a1, a2, b = a1 / norma, a2 / norma, b / norma
+        self.px, self.py = a1 * b, a2 * b
+        self.dx, self.dy = -a2, a1
+        self.angulo = math.atan2(self.dy, self.dx)
+        self.indice = indice
+
+    def fuera(self, x, y):
+        """True si el punto está estrictamente del lado no factible"""
+        return self.dx * (y - self.py) - self.dy * (x - self.px) < -EPS
+
+
+def _interseccion(s, t):
+    cruz = s.dx * t.dy - s.dy * t.dx
+    u = ((t.px - s.px) * t.dy - (t.py - s.py) * t.dx) / cruz
+    return s.px + u * s.dx, s.py + u * s.dy
+
+
+def _limpiar(valor):
+    return round(valor, DECIMALES) + 0.0
+
+
+def interseccion_semiplanos(restricciones):
+    """Polígono factible de restricciones [(a1, a2, b), ...]
+
+    Devuelve (vertices, planos): vértices en sentido antihorario y, para cada
+    arista i (de vertices[i] a vertices[i+1]), el índice de su restricción o
+    None si es la caja auxiliar. Una región vacía o de área nula da ([], []).
+    """
+    planos = []
+    for indice, (a1, a2, b) in enumerate(restricciones):
+        if abs(a1) < EPS and abs(a2) < EPS:
+            if b < -EPS:
+                return [], []  # 0 ≤ b con b negativo: infactible
+            continue
+        planos.append(_Semiplano(a1, a2, b, indice))
+    for a1, a2 in ((1, 0), (-1, 0), (0, 1), (0, -1)):
+        planos.append(_Semiplano(a1, a2, LIMITE, None))
+    planos.sort(key=lambda s: s.angulo)
+
+    cola = deque()
+    for plano in planos:
+        while len(cola) > 1 and plano.fuera(*_interseccion(cola[-1], cola[-2])):
+            cola.pop()
+        while len(cola) > 1 and plano.fuera(*_interseccion(cola[0], cola[1])):
+            cola.popleft()
+        if cola and abs(plano.dx * cola[-1].dy - plano.dy * cola[-1].dx) < EPS:
+            if plano.dx * cola[-1].dx + plano.dy * cola[-1].dy < 0:
+                return [], []  # paralelas opuestas consecutivas: región vacía
+            if plano.fuera(cola[-1].px, cola[-1].py):
+                cola.pop()  # misma dirección: queda la más restrictiva
+            else:
+                continue
+        cola.append(plano)
+    while len(cola) > 2 and cola[0].fuera(*_interseccion(cola[-1], cola[-2])):
+        cola.pop()
+    while len(cola) > 2 and cola[-1].fuera(*_interseccion(cola[0], cola[1])):
+        cola.popleft()
+    if len(cola) < 3:
+        return [], []
+
+    lista = list(cola)
+    vertices = [_interseccion(lista[i - 1], lista[i]) for i in range(len(lista))]
+    # Dos paralelas opuestas que nunca quedan contiguas en la deque pasan los
+    # filtros: el centroide de una región no vacía cumple todos los semiplanos
+    cx = sum(x for x, _ in vertices) / len(vertices)
+    cy = sum(y for _, y in vertices) / len(vertices)
+    tolerancia = EPS * max(1.0, abs(cx), abs(cy))
+    if any(plano.dx * (cy - plano.py) - plano.dy * (cx - plano.px) < -tolerancia for plano in planos):
+        return [], []
+    planos_arista = [plano.indice for plano in lista]
+    return [(_limpiar(x), _limpiar(y)) for x, y in vertices], planos_arista
+
+
+def resolver_region(restricciones, objetivo):
+    """Región factible y máximo de objetivo[0]·x + objetivo[1]·y
+
+    Devuelve un diccionario con 'estado' ('optimo', 'vacia' o 'no_acotado'),
+    'acotada', 'vertices' (si la región es no acotada incluyen los de la caja
+    auxiliar, para poder dibujarla recortada), 'punto', 'z' y 'activas'
+    (índices de las restricciones que se cruzan en el óptimo). Los empates
+    se rompen como max() sobre (z, (x, y)).
+    """
+    vertices, planos = interseccion_semiplanos(restricciones)
+    if not vertices:
+        return {'estado': 'vacia', 'acotada': True, 'vertices': [], 'punto': None, 'z': None, 'activas': []}
+
+    a, b = objetivo
+    acotada = None not in planos
+    # vertices[i] es la intersección de las aristas planos[i - 1] y planos[i]
+    candidatos = []
+    for i, (x, y) in enumerate(vertices):
+        activas = [planos[i - 1], planos[i]]
+        candidatos.append((_limpiar(a * x + b * y), (x, y), activas))
+    z_max = max(z for z, _, _ in candidatos)
+    tolerancia = EPS * max(1.0, abs(z_max))
+    mejores = [c for c in candidatos if c[0] >= z_max - tolerancia and None not in c[2]]
+    if not mejores:
+        return {'estado': 'no_acotado', 'acotada': acotada, 'vertices': [list(v) for v in vertices],
+                'punto': None, 'z': None, 'activas': []}
+
+    z, punto, activas = max(mejores, key=lambda c: (c[0], c[1]))
+    return {
+        'estado': 'optimo',
+        'acotada': acotada,
+        'vertices': [list(v) for v in vertices],
+        'punto': list(punto),
+        'z': z,
+        'activas': sorted(set(activas))
+    }
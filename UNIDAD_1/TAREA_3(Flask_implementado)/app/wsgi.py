@@ -0,0 +1,11 @@
+"""Punto de entrada WSGI para producción
+
+    gunicorn -w 4 --threads 4 -b 0.0.0.0:8000 wsgi:app
+    waitress-serve --threads 8 --port 8000 wsgi:app
+
+Cada worker crea su propia aplicación y la precalienta al arrancar
+(numpy, matplotlib y fuentes); /healthz responde 503 hasta que termina.
+"""
+from app import create_app
+
+app = create_app()
@@ -1,11 +1,42 @@
+import argparse
+import math
 import pandas as pd
 import numpy as np
 import os
-from scipy.optimize import minimize
-from itertools import combinations
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds
 import warnings
 warnings.filterwarnings('ignore')
 
+SECTORS = [1, 2, 3, 4, 5]
+# Columnas del activo que se copian en cada posición del portafolio
+PORTFOLIO_COLUMNS = ['retorno_esperado', 'volatilidad', 'beta', 'sector',
+                     'precio_accion', 'min_inversion', 'liquidez_score']
+# Parámetros del optimizador que se copian a los procesos de GRASP
+OPTIMIZER_SETTINGS = ['PRESUPUESTO', 'LAMBDA', 'MAX_SECTOR_WEIGHT', 'MIN_ASSETS', 'MAX_BETA']
+# Candidatos evaluados por bloque en las pasadas greedy vectorizadas
+GREEDY_CHUNK_SIZE = 256
+
+
+def _fraction_bits(values):
+    """Bits fraccionarios que bastan para escribir todos los floats de values como enteros"""
+    return max((value.as_integer_ratio()[1].bit_length() - 1 for value in values), default=0)
+
+
+def _scaled(value, bits):
+    """Entero value * 2**bits, exacto (ValueError si value necesita más bits)"""
+    numerator, denominator = value.as_integer_ratio()
+    return numerator << (bits + 1 - denominator.bit_length())
+
+
+def _descending_order(values):
+    """Posiciones en orden descendente, con los mismos empates que sort_values(ascending=False)"""
+    reversed_positions = np.arange(len(values))[::-1]
+    return reversed_positions[values[::-1].argsort(kind='quicksort')][::-1]
+
+
 class AggressivePortfolioOptimizer:
     def __init__(self):
         self.PRESUPUESTO = 1_000_000
@@ -15,6 +46,8 @@ class AggressivePortfolioOptimizer:
         self.MAX_BETA = 1.2
         self.data = None
         self.optimal_portfolio = None
+        self.strategy_results = None
+        self._grasp_orders = {}
         
     def load_data(self, filename='Ronda1.xlsx'):
         """Carga los datos del archivo Excel desde el directorio actual"""
@@ -50,6 +83,7 @@ class AggressivePortfolioOptimizer:
         self.data['efficiency_combo'] = (self.data['utility_score'] * 0.4 + 
                                         self.data['sharpe_ratio'] * 0.3 + 
                                         self.data['return_per_dollar'] * 0.3)
+        self._build_asset_arrays()
         
         best_portfolio = None
         best_score = -999999
@@ -85,6 +119,7 @@ class AggressivePortfolioOptimizer:
             (portfolio4, score4, "Alto riesgo/retorno")
         ]
         
+        self.strategy_results = strategies
         best_portfolio, best_score, best_strategy = max(strategies, key=lambda x: x[1])
         
         print(f"\n🏆 MEJOR ESTRATEGIA: {best_strategy}")
@@ -93,210 +128,576 @@ class AggressivePortfolioOptimizer:
         self.optimal_portfolio = best_portfolio
         return best_portfolio
     
-    def _strategy_top_performers_by_sector(self):
-        """Estrategia: Mejores performers por cada sector"""
-        portfolio = []
-        total_investment = 0
-        sector_investments = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+    def exact_optimization(self, time_limit=60, min_budget_use=0.0, gap_tolerance=1e-3,
+                           include_penalized=True):
+        """Modo exacto: programa entero mixto sobre el número de acciones
         
-        # Obtener top 3-4 activos por sector ordenados por utility_score
-        for sector in [1, 2, 3, 4, 5]:
-            sector_data = self.data[self.data['sector'] == sector].sort_values('utility_score', ascending=False)
-            sector_budget = self.PRESUPUESTO * 0.28  # Usar casi el máximo permitido (30%)
-            sector_investment = 0
+        Resuelve con HiGHS (scipy.optimize.milp) el problema con presupuesto,
+        inversión mínima semicontinua, límite sectorial, mínimo de activos y beta
+        máximo. La volatilidad (norma euclidiana) se acota con una aproximación
+        poliédrica exterior y el cociente retorno/inversión se trata con
+        iteraciones de Dinkelbach, así que la cota superior es válida para
+        cualquier portafolio. Con min_budget_use > 0 solo se consideran (y la
+        cota solo vale para) portafolios que invierten al menos esa fracción del
+        presupuesto, y la restricción se imprime junto a la brecha.
+        Con include_penalized también se resuelve el problema sin restricciones
+        (Fr = 0.8) por si un portafolio penalizado puntúa más.
+        """
+        if self.data is None:
+            print("❌ No hay datos cargados")
+            return None
+        if self.strategy_results is None:
+            self.aggressive_optimization()
+        
+        print("\n🧮 MODO EXACTO (MILP con HiGHS)")
+        print("="*70)
+        
+        start = time.perf_counter()
+        # La mejor utilidad greedy es el punto de partida de Dinkelbach
+        initial_utility = max((self.score_state(portfolio).utility
+                               for portfolio, _, _ in self.strategy_results if portfolio), default=0.0)
+        
+        runs = [(True, 1.0, time_limit * (2 / 3 if include_penalized else 1))]
+        if include_penalized:
+            runs.append((False, 0.8, None))
+        
+        candidates = [(portfolio, score, name) for portfolio, score, name in self.strategy_results]
+        score_upper_bound = -np.inf
+        statuses = []
+        for enforce_constraints, fr, run_limit in runs:
+            remaining = time_limit - (time.perf_counter() - start)
+            run_limit = remaining if run_limit is None else min(run_limit, remaining)
+            result = self._solve_milp(enforce_constraints, run_limit, min_budget_use,
+                                      gap_tolerance, initial_utility)
+            statuses.append(result['status'])
+            label = "MILP" if enforce_constraints else "MILP sin restricciones (Fr=0.8)"
+            print(f"📐 {label}: {result['iterations']} iteraciones, estado = {result['status']}")
             
-            for _, asset in sector_data.iterrows():
-                if sector_investment >= sector_budget:
-                    break
-                
-                # Calcular inversión óptima (más agresiva)
-                max_possible_investment = min(
-                    sector_budget - sector_investment,
-                    self.PRESUPUESTO - total_investment
-                )
-                
-                if max_possible_investment < asset['min_inversion']:
-                    continue
-                
-                # Invertir agresivamente - usar múltiplos de la inversión mínima
-                target_investment = min(max_possible_investment, asset['min_inversion'] * 3)
-                shares = int(target_investment / asset['precio_accion'])
-                actual_investment = shares * asset['precio_accion']
-                
-                if actual_investment >= asset['min_inversion'] and actual_investment <= max_possible_investment:
-                    portfolio.append({
-                        'activo_id': asset['activo_id'],
-                        'shares': shares,
-                        'investment': actual_investment,
-                        'retorno_esperado': asset['retorno_esperado'],
-                        'volatilidad': asset['volatilidad'],
-                        'beta': asset['beta'],
-                        'sector': asset['sector'],
-                        'precio_accion': asset['precio_accion'],
-                        'min_inversion': asset['min_inversion'],
-                        'liquidez_score': asset['liquidez_score']
-                    })
-                    
-                    total_investment += actual_investment
-                    sector_investment += actual_investment
-                    sector_investments[sector] += actual_investment
-        
-        return portfolio if len(portfolio) >= self.MIN_ASSETS else None
+            score_upper_bound = max(score_upper_bound, 1000 * fr * result['upper_bound'])
+            if result['shares'] is not None:
+                picked = np.flatnonzero(result['shares'])
+                portfolio = self._portfolio_from_shares(picked, result['shares'], require_min_assets=False)
+                candidates.append((portfolio, self._calculate_score(portfolio), label))
+        
+        best_portfolio, best_score, best_strategy = max(candidates, key=lambda x: x[1])
+        
+        def gap(score):
+            if not np.isfinite(score_upper_bound) or score_upper_bound == 0:
+                return np.nan
+            return (score_upper_bound - score) / abs(score_upper_bound)
+        
+        restriction = f" (solo portafolios con inversión ≥ {min_budget_use:.1%} del presupuesto)" if min_budget_use > 0 else ""
+        print(f"\n📏 Cota superior del puntaje: {score_upper_bound:.0f}{restriction}")
+        for portfolio, score, name in candidates:
+            print(f"   {name:<35} Puntaje = {score:>8.0f}   Brecha = {gap(score)*100:6.2f}%")
+        
+        print(f"\n🏆 MEJOR SOLUCIÓN: {best_strategy}")
+        print(f"🎯 PUNTAJE: {best_score:.0f} (brecha de optimalidad {gap(best_score)*100:.2f}%{restriction})")
+        
+        self.optimal_portfolio = best_portfolio
+        return {
+            'portfolio': best_portfolio,
+            'score': best_score,
+            'strategy': best_strategy,
+            'upper_bound': score_upper_bound,
+            'gap': gap(best_score),
+            'scores': {name: score for _, score, name in candidates},
+            'gaps': {name: gap(score) for _, score, name in candidates},
+            'status': statuses,
+            'elapsed': time.perf_counter() - start
+        }
     
-    def _strategy_maximum_return(self):
-        """Estrategia: Maximizar retorno respetando restricciones"""
-        # Ordenar por retorno esperado
-        sorted_data = self.data.sort_values('retorno_esperado', ascending=False)
+    def _solve_milp(self, enforce_constraints, time_limit, min_budget_use, gap_tolerance,
+                    initial_utility=0.0, cone_angles=32, max_iterations=20):
+        """MILP de acciones enteras con iteraciones de Dinkelbach
         
-        portfolio = []
-        total_investment = 0
-        sector_investments = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        Variables: acciones n_i (enteras), selección y_i (binarias) y un árbol de
+        variables auxiliares cuya raíz s acota por debajo ||volatilidad·peso||.
+        Cada par de nodos del árbol usa cone_angles tangentes del cono de
+        segundo orden en 2-D, una aproximación exterior uniforme de la norma, por
+        lo que la cota superior sigue siendo válida. Cada iteración maximiza
+        sum((r_i - q)·peso_i) - λ·s con q la mejor utilidad conocida.
+        """
+        arrays = self.asset_arrays
+        price = arrays['precio_accion'].astype(float)
+        expected_return = arrays['retorno_esperado'].astype(float)
+        volatility = arrays['volatilidad'].astype(float)
+        n = len(price)
+        
+        min_shares = np.ceil(arrays['min_inversion'] / price)
+        asset_cap = self.PRESUPUESTO * (self.MAX_SECTOR_WEIGHT if enforce_constraints else 1.0)
+        max_shares = np.floor(asset_cap / price)
+        usable = max_shares >= min_shares
+        max_shares[~usable] = 0
+        # Inversión mínima de cualquier portafolio admisible: denominador de la cota
+        # de Dinkelbach y piso de la restricción de presupuesto (excluye el vacío)
+        smallest = np.sort(np.maximum(min_shares, 1)[usable] * price[usable])
+        min_investment = max(min_budget_use * self.PRESUPUESTO,
+                             smallest[:self.MIN_ASSETS if enforce_constraints else 1].sum())
+        
+        # Árbol de conos 2-D: hojas = volatilidad·inversión/PRESUPUESTO de cada activo
+        rows, cols, values = [], [], []
+        num_rows = 0
+        num_vars = 2 * n
+        angles = np.linspace(0, np.pi / 2, cone_angles)
+        
+        def term_coefficients(term):
+            kind, index = term
+            if kind == 'leaf':
+                return [(index, volatility[index] * price[index] / self.PRESUPUESTO)]
+            return [(index, 1.0)]
+        
+        def add_node(children):
+            nonlocal num_rows, num_vars
+            node = num_vars
+            num_vars += 1
+            # node >= cos(θ)·a + sin(θ)·b para cada ángulo (o node >= a si hay un solo hijo)
+            weights = np.column_stack([np.cos(angles), np.sin(angles)]) if len(children) == 2 else np.ones((1, 1))
+            for weight in weights:
+                rows.append(num_rows)
+                cols.append(node)
+                values.append(1.0)
+                for child, child_weight in zip(children, weight):
+                    for column, coefficient in term_coefficients(child):
+                        rows.append(num_rows)
+                        cols.append(column)
+                        values.append(-child_weight * coefficient)
+                num_rows += 1
+            return ('node', node)
+        
+        terms = [('leaf', i) for i in range(n)]
+        while len(terms) > 1:
+            paired = [add_node(terms[i:i + 2]) for i in range(0, len(terms) - 1, 2)]
+            terms = paired + terms[len(paired) * 2:]
+        root = terms[0][1] if terms[0][0] == 'node' else add_node(terms)[1]
+        
+        # Variable fija en 1 que desplaza el objetivo en -q: así la brecha relativa
+        # de HiGHS se mide contra la utilidad y no contra f ≈ 0
+        offset = num_vars
+        num_vars += 1
+        
+        def padded(row):
+            return np.r_[row, np.zeros(num_vars - len(row))]
+        
+        identity = sparse.identity(n, format='csr')
+        padding = sparse.csr_matrix((n, num_vars - 2 * n))
+        investment_row = padded(price)
+        constraints = [
+            LinearConstraint(sparse.csr_matrix((values, (rows, cols)), shape=(num_rows, num_vars)), 0, np.inf),
+            # Semicontinua: n_i = 0 o min_shares_i <= n_i <= max_shares_i
+            LinearConstraint(sparse.hstack([identity, -sparse.diags(min_shares), padding]), 0, np.inf),
+            LinearConstraint(sparse.hstack([identity, -sparse.diags(max_shares), padding]), -np.inf, 0),
+            LinearConstraint(investment_row, min_investment, self.PRESUPUESTO),
+        ]
+        if enforce_constraints:
+            for sector in SECTORS:
+                share = (arrays['sector'] == sector) - self.MAX_SECTOR_WEIGHT
+                constraints.append(LinearConstraint(padded(share * price), -np.inf, 0))
+            constraints.append(LinearConstraint(padded((arrays['beta'] - self.MAX_BETA) * price), -np.inf, 0))
+            constraints.append(LinearConstraint(padded(np.r_[np.zeros(n), np.ones(n)]), self.MIN_ASSETS, np.inf))
+        
+        integrality = padded(np.ones(2 * n))
+        lower = np.zeros(num_vars)
+        upper = np.r_[max_shares, usable.astype(float), np.full(num_vars - 2 * n, np.inf)]
+        lower[offset] = upper[offset] = 1
+        bounds = Bounds(lower, upper)
+        
+        deadline = time.perf_counter() + time_limit
+        q = initial_utility
+        best_shares, best_utility = None, -np.inf
+        upper_bound = np.inf
+        status = 'time_limit'
+        iterations = 0
         
-        for _, asset in sorted_data.iterrows():
-            if total_investment >= self.PRESUPUESTO * 0.95:
+        while iterations < max_iterations:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
                 break
+            iterations += 1
             
-            # Verificar restricción de sector
-            max_sector_investment = self.PRESUPUESTO * self.MAX_SECTOR_WEIGHT
-            available_sector_budget = max_sector_investment - sector_investments[asset['sector']]
-            
-            if available_sector_budget < asset['min_inversion']:
-                continue
+            objective = padded(-(expected_return - q) * price / self.PRESUPUESTO)
+            objective[root] = self.LAMBDA
+            objective[offset] = -q
+            res = milp(objective, integrality=integrality, bounds=bounds, constraints=constraints,
+                       options={'time_limit': remaining, 'mip_rel_gap': gap_tolerance})
+            if res.status == 2:
+                status = 'infeasible'
+                break
+            if res.x is None:
+                break
             
-            # Calcular inversión
-            max_investment = min(
-                available_sector_budget,
-                self.PRESUPUESTO - total_investment,
-                asset['min_inversion'] * 5  # Más agresivo
-            )
+            # f = max (N(x) - q·D(x)) / PRESUPUESTO, así que U(x) <= q + f·PRESUPUESTO / D(x)
+            # con min_investment <= D(x) <= PRESUPUESTO
+            dual_bound = res.mip_dual_bound if res.mip_dual_bound is not None else res.fun
+            f_upper = -dual_bound - q
+            upper_bound = min(upper_bound, q + (f_upper * self.PRESUPUESTO / min_investment
+                                                if f_upper >= 0 else f_upper))
             
-            shares = int(max_investment / asset['precio_accion'])
-            actual_investment = shares * asset['precio_accion']
+            shares = np.round(res.x[:n])
+            investment = shares * price
+            norm = np.sqrt(np.sum((volatility * investment) ** 2))
+            utility = (expected_return @ investment - self.LAMBDA * norm) / investment.sum()
+            if utility > best_utility:
+                best_shares, best_utility = shares.astype(np.int64), utility
             
-            if actual_investment >= asset['min_inversion']:
-                portfolio.append({
-                    'activo_id': asset['activo_id'],
-                    'shares': shares,
-                    'investment': actual_investment,
-                    'retorno_esperado': asset['retorno_esperado'],
-                    'volatilidad': asset['volatilidad'],
-                    'beta': asset['beta'],
-                    'sector': asset['sector'],
-                    'precio_accion': asset['precio_accion'],
-                    'min_inversion': asset['min_inversion'],
-                    'liquidez_score': asset['liquidez_score']
-                })
-                
-                total_investment += actual_investment
-                sector_investments[asset['sector']] += actual_investment
-        
-        return portfolio if len(portfolio) >= self.MIN_ASSETS else None
+            if upper_bound - best_utility <= gap_tolerance * abs(upper_bound):
+                status = 'optimal'
+                break
+            if utility <= q:
+                # q ya no mejora: la cota de esta iteración es la mejor disponible
+                status = 'converged' if res.status == 0 else 'time_limit'
+                break
+            q = utility
+        
+        return {
+            'shares': best_shares,
+            'utility': best_utility,
+            'upper_bound': upper_bound,
+            'status': status,
+            'iterations': iterations
+        }
     
-    def _strategy_balanced_optimal(self):
-        """Estrategia: Balanceado pero agresivo"""
-        portfolio = []
-        total_investment = 0
-        sector_investments = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+    def grasp_optimization(self, iterations=2000, time_limit=None, seed=0, num_workers=None,
+                           rcl_size=8, max_multiplier=8, batch_size=50):
+        """GRASP: construcciones greedy aleatorizadas + mejora local en paralelo
+        
+        Las construcciones se reparten en lotes de batch_size; cada lote tiene su
+        propia semilla derivada de `seed` (SeedSequence.spawn), así que el
+        resultado solo depende de la semilla y de cuántos lotes se completan.
+        time_limit (segundos) deja de enviar lotes nuevos al vencerse; sin él la
+        ejecución es completamente reproducible.
+        """
+        if self.data is None:
+            print("❌ No hay datos cargados")
+            return None
+        if self.strategy_results is None:
+            self.aggressive_optimization()
+        
+        num_workers = num_workers or os.cpu_count() or 1
+        num_batches = -(-iterations // batch_size)
+        seeds = np.random.SeedSequence(seed).spawn(num_batches)
+        tasks = [(index, seeds[index], min(batch_size, iterations - index * batch_size), rcl_size, max_multiplier)
+                 for index in range(num_batches)]
         
-        # Ordenar por efficiency_combo
-        sorted_data = self.data.sort_values('efficiency_combo', ascending=False)
+        print(f"\n🎲 GRASP: {iterations} construcciones, {num_workers} procesos, semilla {seed}")
+        print("="*70)
+        
+        start = time.perf_counter()
+        deadline = None if time_limit is None else start + time_limit
+        results = []
+        if num_workers == 1:
+            for task in tasks:
+                if deadline is not None and time.perf_counter() >= deadline:
+                    break
+                results.append((task[0], self._grasp_batch(*task[1:])))
+        else:
+            settings = {name: getattr(self, name) for name in OPTIMIZER_SETTINGS}
+            with ProcessPoolExecutor(max_workers=num_workers, initializer=_grasp_worker_init,
+                                     initargs=(self.data, settings)) as pool:
+                pending = set()
+                next_task = 0
+                while next_task < len(tasks) or pending:
+                    # Mantener como mucho dos lotes por proceso en vuelo
+                    while (next_task < len(tasks) and len(pending) < 2 * num_workers and
+                           (deadline is None or time.perf_counter() < deadline)):
+                        pending.add(pool.submit(_grasp_worker_batch, tasks[next_task]))
+                        next_task += 1
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    results.extend(future.result() for future in done)
+        
+        if not results:
+            print("❌ GRASP no completó ningún lote")
+            return None
+        
+        # Desempate por índice de lote: el mismo resultado con cualquier número de procesos
+        results.sort(key=lambda result: result[0])
+        best_index, (best_score, best_positions) = max(results, key=lambda result: result[1][0])
+        constructions = sum(tasks[index][2] for index, _ in results)
+        elapsed = time.perf_counter() - start
+        
+        state = self.score_state()
+        for asset, shares in best_positions.items():
+            state.set_position(asset, shares)
+        portfolio = state.to_portfolio()
+        score = self._calculate_score(portfolio)
+        
+        print(f"📊 {constructions} construcciones en {elapsed:.1f} s "
+              f"({constructions / max(elapsed, 1e-9):.0f}/s)")
+        print(f"🎯 MEJOR PUNTAJE GRASP: {score:.0f} (lote {best_index})")
+        
+        current_score = self._calculate_score(self.optimal_portfolio) if self.optimal_portfolio else -999999
+        if score > current_score:
+            self.optimal_portfolio = portfolio
+        return {
+            'portfolio': portfolio,
+            'score': score,
+            'constructions': constructions,
+            'elapsed': elapsed,
+            'seed': seed
+        }
+    
+    def _grasp_batch(self, seed, constructions, rcl_size, max_multiplier):
+        """Ejecuta un lote de construcciones GRASP y devuelve (puntaje, posiciones) del mejor"""
+        rng = np.random.default_rng(seed)
+        best_score, best_positions = -np.inf, {}
+        for _ in range(constructions):
+            state = self._grasp_construct(rng, rcl_size, max_multiplier)
+            self._grasp_improve(state, rng, rcl_size)
+            score = state.score
+            if score > best_score:
+                best_score, best_positions = score, dict(state.positions)
+        return best_score, best_positions
+    
+    def _grasp_construct(self, rng, rcl_size, max_multiplier):
+        """Construcción greedy aleatorizada sobre una lista restringida de candidatos"""
+        arrays = self.asset_arrays
+        price = arrays['precio_accion']
+        min_investment = arrays['min_inversion']
+        sector = arrays['sector']
         
-        target_per_sector = self.PRESUPUESTO * 0.20  # 20% por sector
+        # Alternar el criterio de la lista restringida entre utility_score y efficiency_combo
+        key = 'utility_score' if rng.random() < 0.5 else 'efficiency_combo'
+        if key not in self._grasp_orders:
+            self._grasp_orders[key] = _descending_order(arrays[key])
+        order = self._grasp_orders[key]
         
-        for _, asset in sorted_data.iterrows():
-            if len(portfolio) >= 15:  # Limitar número de activos
+        state = PortfolioScoreState(self)
+        sector_cap = self.PRESUPUESTO * self.MAX_SECTOR_WEIGHT
+        available = np.ones(len(order), dtype=bool)
+        
+        while True:
+            budget_left = self.PRESUPUESTO - state.total_investment
+            room = np.minimum(sector_cap - state.sector_investments[sector[order]], budget_left)
+            candidates = np.flatnonzero(available & (room >= min_investment[order]))[:rcl_size]
+            if len(candidates) == 0:
                 break
             
-            sector = asset['sector']
-            available_budget = min(
-                target_per_sector - sector_investments[sector],
-                self.PRESUPUESTO - total_investment
-            )
+            pick = candidates[rng.integers(len(candidates))]
+            available[pick] = False
+            asset = order[pick]
+            target = min(room[pick], min_investment[asset] * rng.uniform(1, max_multiplier))
+            shares = int(target / price[asset])
+            if shares * price[asset] >= min_investment[asset]:
+                state.set_position(asset, shares)
+        
+        return state
+    
+    def _grasp_improve(self, state, rng, rcl_size, max_passes=5):
+        """Mejora local de primera mejora: redimensionar, quitar y agregar posiciones"""
+        arrays = self.asset_arrays
+        price = arrays['precio_accion']
+        min_investment = arrays['min_inversion']
+        n = len(price)
+        current = state.score
+        
+        for _ in range(max_passes):
+            improved = False
             
-            if available_budget < asset['min_inversion']:
-                continue
+            for asset in rng.permutation(np.fromiter(state.positions, dtype=np.int64)):
+                shares = state.positions.get(asset)
+                if shares is None:
+                    continue
+                step = max(1, shares // 10)
+                for candidate in (shares + step, shares - step, 0):
+                    investment = candidate * price[asset]
+                    if 0 < investment < min_investment[asset]:
+                        continue
+                    if state.total_investment + (candidate - shares) * price[asset] > self.PRESUPUESTO:
+                        continue
+                    score = state.score_if(asset, candidate)
+                    if score > current:
+                        state.set_position(asset, candidate)
+                        current = score
+                        improved = True
+                        break
             
-            # Inversión agresiva
-            target_investment = min(available_budget, asset['min_inversion'] * 4)
-            shares = int(target_investment / asset['precio_accion'])
-            actual_investment = shares * asset['precio_accion']
+            # Probar algunos activos fuera del portafolio con la inversión mínima
+            for asset in rng.choice(n, size=min(rcl_size, n), replace=False):
+                if asset in state.positions:
+                    continue
+                shares = int(np.ceil(min_investment[asset] / price[asset]))
+                if state.total_investment + shares * price[asset] > self.PRESUPUESTO:
+                    continue
+                score = state.score_if(asset, shares)
+                if score > current:
+                    state.set_position(asset, shares)
+                    current = score
+                    improved = True
             
-            if actual_investment >= asset['min_inversion']:
-                portfolio.append({
-                    'activo_id': asset['activo_id'],
-                    'shares': shares,
-                    'investment': actual_investment,
-                    'retorno_esperado': asset['retorno_esperado'],
-                    'volatilidad': asset['volatilidad'],
-                    'beta': asset['beta'],
-                    'sector': asset['sector'],
-                    'precio_accion': asset['precio_accion'],
-                    'min_inversion': asset['min_inversion'],
-                    'liquidez_score': asset['liquidez_score']
-                })
-                
-                total_investment += actual_investment
-                sector_investments[sector] += actual_investment
-        
-        return portfolio if len(portfolio) >= self.MIN_ASSETS else None
+            if not improved:
+                break
+        
+        return state
     
-    def _strategy_high_risk_reward(self):
-        """Estrategia: Alto riesgo, alto retorno"""
-        # Filtrar activos con retorno > 12% y volatilidad < 25%
-        high_performers = self.data[
-            (self.data['retorno_esperado'] > 12) & 
-            (self.data['volatilidad'] < 25) &
-            (self.data['beta'] <= 1.4)
-        ].sort_values('retorno_esperado', ascending=False)
+    def _build_asset_arrays(self):
+        """Guarda la tabla de activos como arreglos NumPy por columna"""
+        self.asset_arrays = {column: self.data[column].to_numpy() for column in self.data.columns}
+        # Los órdenes de GRASP se calcularon sobre los arreglos anteriores
+        self._grasp_orders = {}
+        self.asset_index = {asset_id: position for position, asset_id in enumerate(self.asset_arrays['activo_id'])}
+        # Retorno, volatilidad y beta de cada activo como enteros exactos (_scaled) y su
+        # sector. shares·precio con shares ≥ 1 nunca tiene más bits fraccionarios que
+        # el precio, así que exact_bits['investment'] sirve para toda inversión.
+        columns = {column: [float(value) for value in self.asset_arrays[column].tolist()]
+                   for column in ('precio_accion', 'retorno_esperado', 'volatilidad', 'beta')}
+        self.exact_bits = {column: _fraction_bits(values) for column, values in columns.items()}
+        self.exact_bits['investment'] = self.exact_bits.pop('precio_accion')
+        self.asset_rows = [
+            (_scaled(expected_return, self.exact_bits['retorno_esperado']),
+             _scaled(volatility, self.exact_bits['volatilidad']),
+             _scaled(beta, self.exact_bits['beta']),
+             sector)
+            for expected_return, volatility, beta, sector in zip(
+                columns['retorno_esperado'], columns['volatilidad'], columns['beta'],
+                self.asset_arrays['sector'].tolist())
+        ]
+        return self.asset_arrays
+    
+    def _greedy_kernel(self, order, sector_cap, multiplier, stop, budget_in_skip=False,
+                       enforce_cap=False, total_investment=0, sector_investments=None):
+        """Pasada greedy vectorizada sobre los activos en `order`
         
-        if len(high_performers) < self.MIN_ASSETS:
-            # Relajar criterios si no hay suficientes
-            high_performers = self.data[
-                self.data['retorno_esperado'] > 10
-            ].sort_values('retorno_esperado', ascending=False)
+        Entre dos activos aceptados el estado (inversión total y por sector) no
+        cambia, así que cada bloque de candidatos se evalúa de una sola vez y solo
+        se avanza hasta el primero que se acepta. Devuelve las posiciones
+        aceptadas (en orden), las acciones por activo como arreglo de enteros,
+        la inversión total y la inversión por sector.
+        """
+        arrays = self.asset_arrays
+        price = arrays['precio_accion']
+        min_investment = arrays['min_inversion']
+        sector = arrays['sector']
         
-        portfolio = []
-        total_investment = 0
-        sector_investments = {1: 0, 2: 0, 3: 0, 4: 0, 5: 0}
+        shares = np.zeros(len(price), dtype=np.int64)
+        if sector_investments is None:
+            sector_investments = np.zeros(sector.max() + 1)
+        picked = []
+        position = 0
         
-        for _, asset in high_performers.iterrows():
-            if total_investment >= self.PRESUPUESTO * 0.90:
-                break
+        while position < len(order) and not stop(total_investment, sector_investments, len(picked)):
+            window = order[position:position + GREEDY_CHUNK_SIZE]
+            window_min = min_investment[window]
+            sector_budget = sector_cap - sector_investments[sector[window]]
+            budget_left = self.PRESUPUESTO - total_investment
             
-            max_sector_investment = self.PRESUPUESTO * self.MAX_SECTOR_WEIGHT
-            available_sector_budget = max_sector_investment - sector_investments[asset['sector']]
+            if budget_in_skip:
+                available = np.minimum(sector_budget, budget_left)
+                target = np.minimum(available, window_min * multiplier)
+            else:
+                available = sector_budget
+                target = np.minimum(np.minimum(sector_budget, budget_left), window_min * multiplier)
             
-            if available_sector_budget < asset['min_inversion']:
-                continue
+            # int(target / precio) trunca hacia cero, igual que astype
+            window_shares = (target / price[window]).astype(np.int64)
+            investment = window_shares * price[window]
+            accepted = (available >= window_min) & (investment >= window_min)
+            if enforce_cap:
+                accepted &= investment <= available
             
-            # Inversión muy agresiva
-            max_investment = min(
-                available_sector_budget,
-                self.PRESUPUESTO - total_investment,
-                asset['min_inversion'] * 8  # Muy agresivo
-            )
+            hits = np.flatnonzero(accepted)
+            if hits.size == 0:
+                position += len(window)
+                continue
             
-            shares = int(max_investment / asset['precio_accion'])
-            actual_investment = shares * asset['precio_accion']
+            first = hits[0]
+            asset = window[first]
+            shares[asset] = window_shares[first]
+            total_investment += investment[first]
+            sector_investments[sector[asset]] += investment[first]
+            picked.append(asset)
+            position += first + 1
+        
+        return np.array(picked, dtype=np.int64), shares, total_investment, sector_investments
+    
+    def _portfolio_from_shares(self, picked, shares, require_min_assets=True):
+        """Construye la lista de posiciones a partir de las acciones por activo"""
+        arrays = self.asset_arrays
+        portfolio = []
+        for asset in picked.tolist():
+            position = {'activo_id': arrays['activo_id'][asset], 'shares': int(shares[asset])}
+            position['investment'] = float(shares[asset] * arrays['precio_accion'][asset])
+            for column in PORTFOLIO_COLUMNS:
+                position[column] = arrays[column][asset].item()
+            portfolio.append(position)
+        
+        if require_min_assets and len(portfolio) < self.MIN_ASSETS:
+            return None
+        return portfolio
+    
+    def _strategy_top_performers_by_sector(self):
+        """Estrategia: Mejores performers por cada sector"""
+        arrays = self.asset_arrays
+        sector_budget = self.PRESUPUESTO * 0.28  # Usar casi el máximo permitido (30%)
+        shares = np.zeros(len(arrays['sector']), dtype=np.int64)
+        picked = []
+        total_investment = 0
+        sector_investments = None
+        
+        # Activos de cada sector ordenados por utility_score
+        for sector in SECTORS:
+            positions = np.flatnonzero(arrays['sector'] == sector)
+            order = positions[_descending_order(arrays['utility_score'][positions])]
             
-            if actual_investment >= asset['min_inversion']:
-                portfolio.append({
-                    'activo_id': asset['activo_id'],
-                    'shares': shares,
-                    'investment': actual_investment,
-                    'retorno_esperado': asset['retorno_esperado'],
-                    'volatilidad': asset['volatilidad'],
-                    'beta': asset['beta'],
-                    'sector': asset['sector'],
-                    'precio_accion': asset['precio_accion'],
-                    'min_inversion': asset['min_inversion'],
-                    'liquidez_score': asset['liquidez_score']
-                })
-                
-                total_investment += actual_investment
-                sector_investments[asset['sector']] += actual_investment
-        
-        return portfolio if len(portfolio) >= self.MIN_ASSETS else None
+            # Invertir agresivamente - hasta 3 veces la inversión mínima
+            sector_picked, sector_shares, total_investment, sector_investments = self._greedy_kernel(
+                order, sector_budget, 3,
+                stop=lambda total, sectors, count, sector=sector: sectors[sector] >= sector_budget,
+                budget_in_skip=True, enforce_cap=True,
+                total_investment=total_investment, sector_investments=sector_investments
+            )
+            shares[sector_picked] = sector_shares[sector_picked]
+            picked.append(sector_picked)
+        
+        return self._portfolio_from_shares(np.concatenate(picked), shares)
+    
+    def _strategy_maximum_return(self):
+        """Estrategia: Maximizar retorno respetando restricciones"""
+        # Ordenar por retorno esperado
+        order = _descending_order(self.asset_arrays['retorno_esperado'])
+        
+        picked, shares, _, _ = self._greedy_kernel(
+            order, self.PRESUPUESTO * self.MAX_SECTOR_WEIGHT, 5,  # Más agresivo
+            stop=lambda total, sectors, count: total >= self.PRESUPUESTO * 0.95
+        )
+        return self._portfolio_from_shares(picked, shares)
+    
+    def _strategy_balanced_optimal(self):
+        """Estrategia: Balanceado pero agresivo"""
+        # Ordenar por efficiency_combo, 20% por sector y máximo 15 activos
+        order = _descending_order(self.asset_arrays['efficiency_combo'])
+        
+        picked, shares, _, _ = self._greedy_kernel(
+            order, self.PRESUPUESTO * 0.20, 4,
+            stop=lambda total, sectors, count: count >= 15,
+            budget_in_skip=True
+        )
+        return self._portfolio_from_shares(picked, shares)
+    
+    def _strategy_high_risk_reward(self):
+        """Estrategia: Alto riesgo, alto retorno"""
+        arrays = self.asset_arrays
+        expected_return = arrays['retorno_esperado']
+        
+        # Filtrar activos con retorno > 12% y volatilidad < 25%
+        candidates = np.flatnonzero(
+            (expected_return > 12) &
+            (arrays['volatilidad'] < 25) &
+            (arrays['beta'] <= 1.4)
+        )
+        
+        if len(candidates) < self.MIN_ASSETS:
+            # Relajar criterios si no hay suficientes
+            candidates = np.flatnonzero(expected_return > 10)
+        
+        order = candidates[_descending_order(expected_return[candidates])]
+        
+        picked, shares, _, _ = self._greedy_kernel(
+            order, self.PRESUPUESTO * self.MAX_SECTOR_WEIGHT, 8,  # Muy agresivo
+            stop=lambda total, sectors, count: total >= self.PRESUPUESTO * 0.90
+        )
+        return self._portfolio_from_shares(picked, shares)
     
     def _calculate_score(self, portfolio):
         """Calcula el puntaje de un portafolio"""
@@ -391,6 +792,10 @@ class AggressivePortfolioOptimizer:
             'sector_investments': sector_investments
         }
     
+    def score_state(self, portfolio=None):
+        """Estado de puntaje incremental (PortfolioScoreState) para búsquedas"""
+        return PortfolioScoreState.from_portfolio(self, portfolio)
+    
     def print_champion_results(self):
         """Imprime resultados optimizados para ganar"""
         metrics = self.calculate_detailed_metrics()
@@ -458,8 +863,227 @@ class AggressivePortfolioOptimizer:
         # Mensaje motivacional
         print(f"\n🚀 PROBABILIDAD DE GANAR: {'🔥 ALTA 🔥' if metrics['score'] > 3000 else '⚡ BUENA ⚡' if metrics['score'] > 2000 else '📈 MODERADA'}")
 
+class PortfolioScoreState:
+    """Puntaje de un portafolio mantenido con sumas acumuladas
+    
+    Guarda la inversión total, sum(retorno·inversión), sum((volatilidad·inversión)²),
+    sum(beta·inversión) y la inversión por sector como enteros exactos (escalados
+    por potencias de 2, ver exact_bits), de modo que agregar, quitar o cambiar el tamaño
+    de una posición actualiza retorno, volatilidad, beta, Fr y puntaje en tiempo
+    constante y sin error acumulado. Usa la misma fórmula que _calculate_score;
+    solo difiere en el último bit de las sumas, porque aquí cada métrica se
+    redondea una sola vez desde la suma exacta.
+    """
+    
+    def __init__(self, optimizer):
+        self.optimizer = optimizer
+        arrays = optimizer.asset_arrays
+        self.price = arrays['precio_accion']
+        self.sector = arrays['sector']
+        self._rows = optimizer.asset_rows
+        bits = optimizer.exact_bits
+        self._investment_bits = bits['investment']
+        self._investment_scale = 1 << bits['investment']
+        # Escalas que quedan al dividir cada suma por la inversión total
+        self._return_scale = 1 << bits['retorno_esperado']
+        self._variance_scale = 1 << (2 * bits['volatilidad'])
+        self._beta_scale = 1 << bits['beta']
+        self.positions = {}
+        # Por activo: (inversión, inversión exacta, retorno·inv, (vol·inv)², beta·inv)
+        self._contributions = {}
+        self._total = 0
+        self._return_sum = 0
+        self._variance_sum = 0
+        self._beta_sum = 0
+        self._sector_totals = [0] * (max(int(self.sector.max()), max(SECTORS)) + 1)
+        self.sector_investments = np.zeros(len(self._sector_totals))
+        self.total_investment = 0.0
+        self._metrics = None
+    
+    @classmethod
+    def from_portfolio(cls, optimizer, portfolio):
+        """Crea el estado a partir de una lista de posiciones como las de las estrategias"""
+        state = cls(optimizer)
+        for position in portfolio or []:
+            state.set_position(optimizer.asset_index[position['activo_id']], position['shares'])
+        return state
+    
+    def _contribution(self, asset, shares):
+        # Mismo valor que 'investment' en _portfolio_from_shares
+        investment = float(shares * self.price[asset])
+        expected_return, volatility, beta, _ = self._rows[asset]
+        exact = _scaled(investment, self._investment_bits)
+        weighted_volatility = volatility * exact
+        return (investment, exact, expected_return * exact,
+                weighted_volatility * weighted_volatility, beta * exact)
+    
+    def _apply(self, asset, contribution, sign):
+        _, exact, weighted_return, variance, weighted_beta = contribution
+        sector = self._rows[asset][3]
+        self._total += sign * exact
+        self._return_sum += sign * weighted_return
+        self._variance_sum += sign * variance
+        self._beta_sum += sign * weighted_beta
+        self._sector_totals[sector] += sign * exact
+        # La división entera de Python redondea correctamente
+        self.total_investment = self._total / self._investment_scale
+        self.sector_investments[sector] = self._sector_totals[sector] / self._investment_scale
+    
+    def set_position(self, asset, shares):
+        """Agrega, quita (shares=0) o cambia el tamaño de una posición en O(1)"""
+        current = self._contributions.pop(asset, None)
+        if current is not None:
+            self._apply(asset, current, -1)
+        if shares > 0:
+            contribution = self._contribution(asset, shares)
+            self._apply(asset, contribution, 1)
+            self._contributions[asset] = contribution
+            self.positions[asset] = shares
+        else:
+            self.positions.pop(asset, None)
+        self._metrics = None
+    
+    def add(self, asset, shares):
+        """Suma acciones a una posición (nueva o existente)"""
+        self.set_position(asset, self.positions.get(asset, 0) + shares)
+    
+    def remove(self, asset):
+        """Quita una posición completa"""
+        self.set_position(asset, 0)
+    
+    def _evaluate(self, total, return_sum, variance_sum, beta_sum, max_sector, num_assets):
+        """Métricas, restricciones y puntaje desde las sumas exactas, en O(1)"""
+        optimizer = self.optimizer
+        if not num_assets or total == 0:
+            return {'score': -999999}
+        # Una sola división entera (redondeo correcto) por métrica; la escala de la
+        # inversión se cancela entre numerador y denominador
+        portfolio_return = return_sum / (total * self._return_scale)
+        portfolio_volatility = math.sqrt(variance_sum / (total * total * self._variance_scale))
+        portfolio_beta = beta_sum / (total * self._beta_scale)
+        constraints = {
+            'budget': total / self._investment_scale <= optimizer.PRESUPUESTO,
+            'diversification': num_assets >= optimizer.MIN_ASSETS,
+            'beta_limit': portfolio_beta <= optimizer.MAX_BETA,
+            'sector_limits': max_sector / total <= optimizer.MAX_SECTOR_WEIGHT
+        }
+        Fr = 1.0 if all(constraints.values()) else 0.8
+        utility = portfolio_return - optimizer.LAMBDA * portfolio_volatility
+        return {
+            'portfolio_return': portfolio_return,
+            'portfolio_volatility': portfolio_volatility,
+            'portfolio_beta': portfolio_beta,
+            'constraints': constraints,
+            'Fr': Fr,
+            'utility': utility,
+            'score': 1000 * utility * Fr
+        }
+    
+    def metrics(self):
+        """Métricas de las posiciones actuales (se guardan hasta el próximo cambio)"""
+        if self._metrics is None:
+            max_sector = max(self._sector_totals[sector] for sector in SECTORS)
+            self._metrics = self._evaluate(self._total, self._return_sum, self._variance_sum,
+                                           self._beta_sum, max_sector, len(self.positions))
+        return self._metrics
+    
+    @property
+    def num_assets(self):
+        return len(self.positions)
+    
+    @property
+    def portfolio_return(self):
+        return self.metrics()['portfolio_return']
+    
+    @property
+    def portfolio_volatility(self):
+        return self.metrics()['portfolio_volatility']
+    
+    @property
+    def portfolio_beta(self):
+        return self.metrics()['portfolio_beta']
+    
+    def constraints(self):
+        """Mismas restricciones que _calculate_score"""
+        return self.metrics()['constraints']
+    
+    @property
+    def Fr(self):
+        return self.metrics()['Fr']
+    
+    @property
+    def utility(self):
+        return self.metrics()['utility']
+    
+    @property
+    def score(self):
+        return self.metrics()['score']
+    
+    def score_if(self, asset, shares):
+        """Puntaje que tendría el portafolio con `shares` acciones de `asset`, sin modificarlo (O(1))"""
+        sums = [self._total, self._return_sum, self._variance_sum, self._beta_sum]
+        sector = self._rows[asset][3]
+        sector_total = self._sector_totals[sector]
+        num_assets = len(self.positions)
+        current = self._contributions.get(asset)
+        if current is not None:
+            sums = [value - delta for value, delta in zip(sums, current[1:])]
+            sector_total -= current[1]
+            num_assets -= 1
+        if shares > 0:
+            contribution = self._contribution(asset, shares)
+            sums = [value + delta for value, delta in zip(sums, contribution[1:])]
+            sector_total += contribution[1]
+            num_assets += 1
+        max_sector = max(sector_total if other == sector else self._sector_totals[other] for other in SECTORS)
+        return self._evaluate(*sums, max_sector, num_assets)['score']
+    
+    def to_portfolio(self):
+        """Lista de posiciones en el formato de las estrategias"""
+        shares = np.zeros(len(self.price), dtype=np.int64)
+        picked = np.fromiter(self.positions, dtype=np.int64, count=len(self.positions))
+        shares[picked] = list(self.positions.values())
+        return self.optimizer._portfolio_from_shares(picked, shares)
+
+_GRASP_OPTIMIZER = None
+
+
+def _grasp_worker_init(data, settings):
+    """Crea un optimizador por proceso con la tabla de activos ya preparada"""
+    global _GRASP_OPTIMIZER
+    optimizer = AggressivePortfolioOptimizer()
+    for name, value in settings.items():
+        setattr(optimizer, name, value)
+    optimizer.data = data
+    optimizer._build_asset_arrays()
+    _GRASP_OPTIMIZER = optimizer
+
+
+def _grasp_worker_batch(task):
+    """Ejecuta un lote GRASP en el proceso actual"""
+    index, seed, constructions, rcl_size, max_multiplier = task
+    return index, _GRASP_OPTIMIZER._grasp_batch(seed, constructions, rcl_size, max_multiplier)
+
+
 def main():
     """Función principal para ganar el premio"""
+    parser = argparse.ArgumentParser(description="Optimizador de portafolio Battle Arena")
+    parser.add_argument('--exact', action='store_true',
+                        help="resolver además el MILP exacto e informar la brecha de optimalidad")
+    parser.add_argument('--grasp', action='store_true',
+                        help="ejecutar además GRASP en paralelo con construcciones aleatorizadas")
+    parser.add_argument('--iterations', type=int, default=2000,
+                        help="construcciones GRASP (por defecto 2000)")
+    parser.add_argument('--seed', type=int, default=0, help="semilla de GRASP (por defecto 0)")
+    parser.add_argument('--workers', type=int, default=None,
+                        help="procesos para GRASP (por defecto, uno por núcleo)")
+    parser.add_argument('--time-limit', type=float, default=60,
+                        help="segundos para el modo exacto (por defecto 60)")
+    parser.add_argument('--grasp-time-limit', type=float, default=None,
+                        help="segundos para GRASP; por defecto sin límite, que es lo único "
+                             "reproducible con --seed")
+    args = parser.parse_args()
+    
     print("🏆" * 20)
     print("🚀 OPTIMIZADOR AGRESIVO - MODO CAMPEON 🚀")
     print("🏆" * 20)
@@ -471,6 +1095,15 @@ def main():
     
     # Optimización agresiva
     portfolio = optimizer.aggressive_optimization()
+    if args.exact:
+        # También sin portafolio greedy: el MILP puede encontrar uno por su cuenta
+        result = optimizer.exact_optimization(time_limit=args.time_limit)
+        if result is not None:
+            portfolio = result['portfolio']
+    if portfolio and args.grasp:
+        optimizer.grasp_optimization(iterations=args.iterations, time_limit=args.grasp_time_limit,
+                                     seed=args.seed, num_workers=args.workers)
+        portfolio = optimizer.optimal_portfolio
     
     if portfolio:
         optimizer.print_champion_results()
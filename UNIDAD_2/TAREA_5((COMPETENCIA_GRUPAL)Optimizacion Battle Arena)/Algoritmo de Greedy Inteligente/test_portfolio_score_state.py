@@ -0,0 +1,156 @@
+"""PortfolioScoreState debe dar el mismo puntaje que _calculate_score y las mismas
+métricas que calculate_detailed_metrics (salvo el redondeo de las sumas de pandas)
+
+Uso: python -m pytest test_portfolio_score_state.py
+"""
+import importlib.util
+import math
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+
+def _load_module():
+    # El nombre del archivo tiene espacios: se carga por ruta
+    if 'battle_arena' not in sys.modules:
+        spec = importlib.util.spec_from_file_location(
+            'battle_arena', os.path.join(DIRECTORY, 'Optimizacion Battle Arena.py'))
+        module = importlib.util.module_from_spec(spec)
+        sys.modules['battle_arena'] = module
+        spec.loader.exec_module(module)
+    return sys.modules['battle_arena']
+
+
+def _random_assets(rng, n=100):
+    return pd.DataFrame({
+        'activo_id': [f'A{i:03d}' for i in range(1, n + 1)],
+        'retorno_esperado': np.round(rng.uniform(2, 25, n), 1),
+        'volatilidad': np.round(rng.uniform(5, 40, n), 1),
+        'beta': np.round(rng.uniform(0.3, 2.0, n), 2),
+        'liquidez_score': rng.integers(1, 11, n),
+        'sector': rng.integers(1, 6, n),
+        'precio_accion': np.round(rng.uniform(10, 400, n), 2),
+        'min_inversion': rng.integers(1, 11, n) * 1000
+    })
+
+
+def _optimizer(data):
+    optimizer = _load_module().AggressivePortfolioOptimizer()
+    optimizer.data = data
+    optimizer._build_asset_arrays()
+    return optimizer
+
+
+# Las sumas de pandas redondean en cada paso; el estado redondea la suma exacta una vez
+TOLERANCE = 1e-12
+
+
+def _reference(optimizer, state):
+    """_calculate_score y calculate_detailed_metrics sobre las posiciones del estado
+    (también con menos de MIN_ASSETS)"""
+    shares = np.zeros(len(state.price), dtype=np.int64)
+    picked = np.fromiter(state.positions, dtype=np.int64, count=len(state.positions))
+    shares[picked] = list(state.positions.values())
+    portfolio = optimizer._portfolio_from_shares(picked, shares, require_min_assets=False)
+    optimizer.optimal_portfolio = portfolio
+    return optimizer._calculate_score(portfolio), optimizer.calculate_detailed_metrics()
+
+
+def _assert_matches_reference(optimizer, state):
+    score, metrics = _reference(optimizer, state)
+    assert state.score == pytest.approx(score, rel=TOLERANCE, abs=TOLERANCE)
+    if metrics is None:
+        return
+    assert state.Fr == metrics['Fr']
+    assert state.constraints() == metrics['constraints']
+    for name in ('portfolio_return', 'portfolio_volatility', 'portfolio_beta', 'utility'):
+        assert getattr(state, name) == pytest.approx(metrics[name], rel=TOLERANCE, abs=TOLERANCE)
+
+
+def _datasets():
+    yield 'aleatorio', _random_assets(np.random.default_rng(0))
+    workbook = os.path.join(DIRECTORY, 'Ronda1.xlsx')
+    if os.path.exists(workbook):
+        yield 'Ronda1', pd.read_excel(workbook)
+
+
+@pytest.mark.parametrize('name,data', list(_datasets()))
+def test_score_matches_calculate_score_on_random_states(name, data):
+    optimizer = _optimizer(data)
+    price = optimizer.asset_arrays['precio_accion']
+    rng = np.random.default_rng(1)
+    n = len(data)
+    fr_values = set()
+    for _ in range(300):
+        state = optimizer.score_state()
+        # Secuencias de altas, bajas y cambios de tamaño, como en GRASP, con
+        # posiciones cerca de PRESUPUESTO / 12 para rondar los límites
+        for _ in range(rng.integers(1, 40)):
+            asset = int(rng.integers(n))
+            move = rng.random()
+            if move < 0.6:
+                target = rng.uniform(0.3, 1.7) * optimizer.PRESUPUESTO / 12
+                state.set_position(asset, max(1, int(target / price[asset])))
+            elif move < 0.8:
+                state.add(asset, int(rng.integers(1, 50)))
+            else:
+                state.remove(asset)
+            assert state.total_investment == math.fsum(
+                shares * price[asset] for asset, shares in state.positions.items())
+        # La referencia con pandas es lenta: se compara al final de cada secuencia
+        _assert_matches_reference(optimizer, state)
+        if state.positions:
+            fr_values.add(state.Fr)
+    # Los estados cubren portafolios que cumplen y que no cumplen las restricciones
+    assert fr_values == {1.0, 0.8}
+
+
+def test_score_does_not_depend_on_position_order():
+    optimizer = _optimizer(_random_assets(np.random.default_rng(2)))
+    rng = np.random.default_rng(3)
+    for _ in range(100):
+        assets = rng.choice(len(optimizer.data), size=12, replace=False)
+        forward = optimizer.score_state()
+        backward = optimizer.score_state()
+        for asset, shares in zip(assets, rng.integers(1, 3000, size=len(assets))):
+            forward.set_position(int(asset), int(shares))
+        for asset in assets[::-1]:
+            backward.set_position(int(asset), forward.positions[int(asset)])
+        # Sumas exactas: el orden de las altas no cambia ni el último bit
+        assert forward.score == backward.score
+        assert forward.portfolio_volatility == backward.portfolio_volatility
+
+
+def test_sums_do_not_drift_after_many_moves():
+    optimizer = _optimizer(_random_assets(np.random.default_rng(5)))
+    rng = np.random.default_rng(6)
+    state = optimizer.score_state()
+    for _ in range(5000):
+        state.set_position(int(rng.integers(len(optimizer.data))), int(rng.integers(0, 400)))
+    fresh = optimizer.score_state()
+    for asset, shares in state.positions.items():
+        fresh.set_position(asset, shares)
+    assert state.score == fresh.score
+    assert state.metrics() == fresh.metrics()
+
+
+def test_score_if_leaves_state_unchanged():
+    optimizer = _optimizer(_random_assets(np.random.default_rng(4)))
+    state = optimizer.score_state()
+    for asset, shares in ((0, 100), (5, 250), (9, 40), (17, 300), (23, 75)):
+        state.set_position(asset, shares)
+    before = (dict(state.positions), state.total_investment, state.sector_investments.copy(), state.score)
+    for asset, shares in ((0, 0), (5, 500), (42, 10)):
+        state.set_position(asset, shares)
+        expected = state.score
+        state.set_position(asset, before[0].get(asset, 0))
+        assert state.score_if(asset, shares) == expected
+    assert state.positions == before[0]
+    assert state.total_investment == before[1]
+    assert np.array_equal(state.sector_investments, before[2])
+    assert state.score == before[3]
@@ -1,3 +1,5 @@
+import os
+import sys
 import pandas as pd
 import numpy as np
 from ortools.constraint_solver import pywrapcp, routing_enums_pb2
@@ -5,6 +7,9 @@ from sklearn.svm import SVC
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import accuracy_score
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from distancias import calcular_matriz_distancias, registrar_matriz_transito
+
 # Leer datos desde Excel
 file_path = '/mnt/data/19MDVRP Problem Sets (1).xlsx'
 xls = pd.ExcelFile(file_path)
@@ -18,14 +23,8 @@ depots_df = df.dropna(subset=['Depot x coordinate', 'Depot y coordinate'])
 depot_coords = depots_df[['Depot x coordinate', 'Depot y coordinate']].values
 
 # Calcula matriz de distancias
-def create_distance_matrix(coords):
-    size = len(coords)
-    dist_matrix = np.zeros((size, size))
-    for i in range(size):
-        for j in range(size):
-            if i != j:
-                dist_matrix[i][j] = np.linalg.norm(coords[i] - coords[j])
-    return dist_matrix
+def create_distance_matrix(coords, dtype=np.float64, scale=None):
+    return calcular_matriz_distancias(coords, dtype=dtype, escala=scale, simetrica=True)
 
 distance_matrix = create_distance_matrix(np.vstack([depot_coords, customer_coords]))
 
@@ -34,12 +33,8 @@ def solve_mdvrp(dist_matrix, num_depots, num_customers):
     manager = pywrapcp.RoutingIndexManager(len(dist_matrix), num_depots, list(range(num_depots)))
     routing = pywrapcp.RoutingModel(manager)
 
-    def distance_callback(from_index, to_index):
-        from_node = manager.IndexToNode(from_index)
-        to_node = manager.IndexToNode(to_index)
-        return dist_matrix[from_node][to_node]
-
-    transit_callback_index = routing.RegisterTransitCallback(distance_callback)
+    # Native transit matrix (int64) instead of a Python callback per arc
+    transit_callback_index = registrar_matriz_transito(routing, dist_matrix)
     routing.SetArcCostEvaluatorOfAllVehicles(transit_callback_index)
 
     search_parameters = pywrapcp.DefaultRoutingSearchParameters()
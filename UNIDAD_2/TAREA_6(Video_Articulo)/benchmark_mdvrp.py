@@ -0,0 +1,224 @@
+"""Banco de pruebas de ResolveMDVRP sobre las hojas de 19MDVRP Problem Sets
+
+Uso:
+    python benchmark_mdvrp.py correr --tiempo 10 --salida resultados.json
+    python benchmark_mdvrp.py correr --mejores mejores_conocidas.json --problemas 1 2 3
+    python benchmark_mdvrp.py comparar base.json nuevo.json
+
+'correr' resuelve cada problema en un proceso nuevo (así el pico de RSS es
+el de ese problema) y escribe JSON y CSV con tiempo total, tiempo hasta la
+primera solución, distancia final, brecha contra la tabla de mejores
+conocidas ({"numero_problema": distancia}) y pico de memoria.
+'comparar' marca regresiones entre dos archivos de resultados y termina con
+código 1 si encuentra alguna.
+
+No hay semilla: OR-Tools no usa random ni np.random. La búsqueda es
+determinista (un solo hilo) solo si se detiene por número de soluciones;
+con límite de tiempo, la distancia final depende de cuánto avance la
+búsqueda en la máquina, así que conviene comparar corridas en el mismo equipo.
+"""
+import argparse
+import csv
+import importlib.util
+import json
+import os
+import platform
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows: sin medición de RSS
+    resource = None
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+EXCEL_POR_DEFECTO = os.path.join(DIRECTORIO, '19MDVRP Problem Sets.xlsx')
+COLUMNAS = ['numero_problema', 'estado', 'clientes', 'distancia_total', 'mejor_conocida', 'brecha_pct',
+            'tiempo_s', 'tiempo_primera_solucion_s', 'soluciones_encontradas', 'criterio_parada',
+            'num_vehiculos_usados', 'rss_pico_mb']
+
+
+def cargar_modulo_mdvrp():
+    """Importar 'dataset vehiculos19.py' (el nombre con espacio impide un import normal)"""
+    if 'dataset_vehiculos19' not in sys.modules:
+        sys.path.insert(0, DIRECTORIO)
+        spec = importlib.util.spec_from_file_location(
+            'dataset_vehiculos19', os.path.join(DIRECTORIO, 'dataset vehiculos19.py'))
+        modulo = importlib.util.module_from_spec(spec)
+        sys.modules['dataset_vehiculos19'] = modulo
+        spec.loader.exec_module(modulo)
+    return sys.modules['dataset_vehiculos19']
+
+
+def rss_pico_mb():
+    """Pico de memoria residente del proceso actual en MB (None si no se puede medir)"""
+    if resource is None:
+        return None
+    pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux informa KB y macOS bytes
+    return pico / (1024 * 1024) if sys.platform == 'darwin' else pico / 1024
+
+
+def _correr_problema(tarea):
+    """Resolver un problema en un proceso del pool y devolver su fila de resultados"""
+    numero_problema, problema, num_vehiculos, tiempo_limite, opciones = tarea
+    mdvrp = cargar_modulo_mdvrp()
+    resolvedor = mdvrp.ResolveMDVRP(None, problemas={numero_problema: problema})
+    parada = mdvrp.PoliticaParada(tiempo_limite=tiempo_limite)
+
+    inicio = time.perf_counter()
+    solucion = resolvedor.resolver_problema(numero_problema, num_vehiculos=num_vehiculos,
+                                            parada=parada, **opciones)
+    tiempo = time.perf_counter() - inicio
+    fila = {
+        'numero_problema': numero_problema,
+        'estado': 'resuelto' if solucion else 'sin solución',
+        'clientes': len(problema['clientes']),
+        'tiempo_s': tiempo,
+        'rss_pico_mb': rss_pico_mb()
+    }
+    if solucion:
+        fila.update({
+            'distancia_total': solucion['distancia_total'],
+            'num_vehiculos_usados': solucion['num_vehiculos_usados'],
+            'tiempo_primera_solucion_s': solucion['tiempo_primera_solucion_s'],
+            'soluciones_encontradas': solucion['soluciones_encontradas'],
+            'criterio_parada': solucion['criterio_parada']
+        })
+    return fila
+
+
+def correr(args):
+    mdvrp = cargar_modulo_mdvrp()
+    resolvedor = mdvrp.ResolveMDVRP(args.excel, perezoso=True)
+    numeros = args.problemas or list(resolvedor.problemas)
+    mejores = {}
+    if args.mejores:
+        with open(args.mejores, encoding='utf-8') as archivo:
+            mejores = {int(numero): valor for numero, valor in json.load(archivo).items()}
+    opciones = {'k_vecinos': args.k_vecinos, 'pulir': args.pulir}
+
+    tareas = []
+    for numero_problema in numeros:
+        problema = resolvedor.problemas.get(numero_problema)
+        if problema is None:
+            print(f"Problema {numero_problema} no encontrado o inválido; se omite")
+            continue
+        num_vehiculos = args.vehiculos or problema['num_depositos']
+        tareas.append((numero_problema, problema, num_vehiculos, args.tiempo, opciones))
+
+    filas = []
+    # Un proceso nuevo por problema: el pico de RSS no arrastra corridas anteriores
+    with ProcessPoolExecutor(max_workers=args.procesos, max_tasks_per_child=1) as pool:
+        for fila in pool.map(_correr_problema, tareas):
+            mejor = mejores.get(fila['numero_problema'])
+            fila['mejor_conocida'] = mejor
+            if mejor and fila.get('distancia_total') is not None:
+                fila['brecha_pct'] = 100 * (fila['distancia_total'] - mejor) / mejor
+            filas.append({columna: fila.get(columna) for columna in COLUMNAS})
+            print(f"Problema {fila['numero_problema']}: {fila['estado']}, "
+                  f"distancia {fila.get('distancia_total')}, {fila['tiempo_s']:.1f} s")
+
+    metadatos = {
+        'fecha': datetime.now().isoformat(timespec='seconds'),
+        'excel': os.path.basename(args.excel),
+        'tiempo_limite': args.tiempo,
+        'vehiculos': args.vehiculos,
+        'opciones': opciones,
+        'python': platform.python_version(),
+        'plataforma': platform.platform()
+    }
+    with open(args.salida, 'w', encoding='utf-8') as archivo:
+        json.dump({'metadatos': metadatos, 'resultados': filas}, archivo, indent=2, ensure_ascii=False)
+    ruta_csv = os.path.splitext(args.salida)[0] + '.csv'
+    with open(ruta_csv, 'w', newline='', encoding='utf-8') as archivo:
+        escritor = csv.DictWriter(archivo, fieldnames=COLUMNAS)
+        escritor.writeheader()
+        escritor.writerows(filas)
+    print(f"Resultados en {args.salida} y {ruta_csv}")
+
+
+def _relativo(antes, despues):
+    if antes in (None, 0) or despues is None:
+        return None
+    return (despues - antes) / antes
+
+
+def comparar(args):
+    with open(args.base, encoding='utf-8') as archivo:
+        base = {fila['numero_problema']: fila for fila in json.load(archivo)['resultados']}
+    with open(args.nuevo, encoding='utf-8') as archivo:
+        nuevo = {fila['numero_problema']: fila for fila in json.load(archivo)['resultados']}
+
+    tolerancias = {
+        'distancia_total': args.tol_distancia,
+        'tiempo_s': args.tol_tiempo,
+        'tiempo_primera_solucion_s': args.tol_tiempo,
+        'rss_pico_mb': args.tol_memoria
+    }
+    regresiones = []
+    print(f"{'Problema':>8} {'Distancia':>19} {'Tiempo (s)':>17} {'1ª sol. (s)':>15} {'RSS (MB)':>15}")
+    for numero in sorted(set(base) & set(nuevo)):
+        antes, despues = base[numero], nuevo[numero]
+        celdas = []
+        for metrica, tolerancia in tolerancias.items():
+            cambio = _relativo(antes.get(metrica), despues.get(metrica))
+            marca = ''
+            # Diferencias de tiempo menores a 50 ms son ruido de medición
+            ruido = metrica.startswith('tiempo') and cambio is not None and \
+                abs(despues[metrica] - antes[metrica]) < 0.05
+            if cambio is not None and cambio > tolerancia and not ruido:
+                marca = '!'
+                regresiones.append(f"Problema {numero}: {metrica} {antes[metrica]:.6g} -> "
+                                   f"{despues[metrica]:.6g} (+{100 * cambio:.1f} %)")
+            celdas.append('-' if cambio is None else f"{100 * cambio:+.1f}%{marca}")
+        if antes['estado'] == 'resuelto' and despues['estado'] != 'resuelto':
+            regresiones.append(f"Problema {numero}: {antes['estado']} -> {despues['estado']}")
+        print(f"{numero:>8} {celdas[0]:>19} {celdas[1]:>17} {celdas[2]:>15} {celdas[3]:>15}")
+
+    for numero in sorted(set(base) - set(nuevo)):
+        regresiones.append(f"Problema {numero}: ausente en {args.nuevo}")
+
+    if regresiones:
+        print("\nRegresiones:")
+        for regresion in regresiones:
+            print(f"  {regresion}")
+        return 1
+    print("\nSin regresiones")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+
+    parser_correr = subparsers.add_parser('correr', help="resolver los problemas y guardar resultados")
+    parser_correr.add_argument('--excel', default=EXCEL_POR_DEFECTO)
+    parser_correr.add_argument('--problemas', type=int, nargs='*', help="por defecto, todas las hojas")
+    parser_correr.add_argument('--tiempo', type=float, default=30, help="segundos por problema")
+    parser_correr.add_argument('--vehiculos', type=int, help="por defecto, uno por depósito")
+    parser_correr.add_argument('--k-vecinos', type=int)
+    parser_correr.add_argument('--pulir', action='store_true')
+    parser_correr.add_argument('--mejores', help="JSON {numero_problema: mejor distancia conocida}")
+    parser_correr.add_argument('--procesos', type=int, default=1,
+                               help="problemas simultáneos (más de 1 altera los tiempos)")
+    parser_correr.add_argument('--salida', default='resultados_benchmark.json')
+
+    parser_comparar = subparsers.add_parser('comparar', help="marcar regresiones entre dos corridas")
+    parser_comparar.add_argument('base')
+    parser_comparar.add_argument('nuevo')
+    parser_comparar.add_argument('--tol-distancia', type=float, default=0.01)
+    parser_comparar.add_argument('--tol-tiempo', type=float, default=0.25)
+    parser_comparar.add_argument('--tol-memoria', type=float, default=0.25)
+
+    args = parser.parse_args()
+    if args.comando == 'correr':
+        correr(args)
+        return 0
+    return comparar(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
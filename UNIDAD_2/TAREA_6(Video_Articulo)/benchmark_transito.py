@@ -0,0 +1,85 @@
+"""Comparar el callback de distancia en Python con la matriz de tránsito nativa
+
+Uso:
+    python benchmark_transito.py --clientes 500 --depositos 4 --tiempo 10
+"""
+import argparse
+import time
+
+import numpy as np
+from ortools.constraint_solver import routing_enums_pb2
+from ortools.constraint_solver import pywrapcp
+
+from distancias import calcular_matriz_distancias, registrar_matriz_transito
+
+
+def crear_instancia(num_clientes, num_depositos, semilla):
+    """Instancia aleatoria en [0, 1000]²: primero los depósitos y luego los clientes"""
+    rng = np.random.default_rng(semilla)
+    coordenadas = rng.uniform(0, 1000, size=(num_depositos + num_clientes, 2))
+    return calcular_matriz_distancias(coordenadas, dtype=np.int64, simetrica=True)
+
+
+def resolver(matriz, num_depositos, modo, tiempo_limite):
+    """Resolver con GLS durante tiempo_limite y medir el ritmo de búsqueda"""
+    depositos = list(range(num_depositos))
+    administrador = pywrapcp.RoutingIndexManager(len(matriz), num_depositos, depositos, depositos)
+    enrutamiento = pywrapcp.RoutingModel(administrador)
+
+    if modo == 'callback':
+        def callback_distancia(desde_indice, hasta_indice):
+            desde_nodo = administrador.IndexToNode(desde_indice)
+            hasta_nodo = administrador.IndexToNode(hasta_indice)
+            return int(matriz[desde_nodo][hasta_nodo])
+        indice_transito = enrutamiento.RegisterTransitCallback(callback_distancia)
+    else:
+        indice_transito = registrar_matriz_transito(enrutamiento, matriz)
+    enrutamiento.SetArcCostEvaluatorOfAllVehicles(indice_transito)
+
+    soluciones = [0]
+    enrutamiento.AddAtSolutionCallback(lambda: soluciones.__setitem__(0, soluciones[0] + 1))
+
+    parametros = pywrapcp.DefaultRoutingSearchParameters()
+    parametros.first_solution_strategy = routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+    parametros.local_search_metaheuristic = routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+    parametros.time_limit.FromMilliseconds(int(tiempo_limite * 1000))
+
+    inicio = time.perf_counter()
+    solucion = enrutamiento.SolveWithParameters(parametros)
+    duracion = time.perf_counter() - inicio
+    solver = enrutamiento.solver()
+    return {
+        'modo': modo,
+        'costo': solucion.ObjectiveValue() if solucion else None,
+        'soluciones': soluciones[0],
+        'soluciones_s': soluciones[0] / duracion,
+        'ramas_s': solver.Branches() / duracion,
+        'fallos_s': solver.Failures() / duracion,
+        'tiempo_s': duracion
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clientes', type=int, default=500)
+    parser.add_argument('--depositos', type=int, default=4)
+    parser.add_argument('--tiempo', type=float, default=10, help="segundos por corrida")
+    parser.add_argument('--semilla', type=int, default=0)
+    args = parser.parse_args()
+
+    matriz = crear_instancia(args.clientes, args.depositos, args.semilla)
+    print(f"Instancia: {args.clientes} clientes, {args.depositos} depósitos, {args.tiempo:.0f} s por corrida")
+    print(f"{'Modo':<10} {'Costo':>10} {'Soluciones':>11} {'Sol/s':>8} {'Ramas/s':>9} {'Fallos/s':>9}")
+
+    resultados = [resolver(matriz, args.depositos, modo, args.tiempo) for modo in ('callback', 'matriz')]
+    for r in resultados:
+        print(f"{r['modo']:<10} {r['costo']:>10} {r['soluciones']:>11} {r['soluciones_s']:>8.1f} "
+              f"{r['ramas_s']:>9.1f} {r['fallos_s']:>9.1f}")
+
+    antes, despues = resultados
+    if antes['soluciones_s'] > 0:
+        print(f"\nAceleración (soluciones/s): {despues['soluciones_s'] / antes['soluciones_s']:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,17 +3,57 @@ import numpy as np
 from ortools.constraint_solver import routing_enums_pb2
 from ortools.constraint_solver import pywrapcp
 import matplotlib.pyplot as plt
+import asyncio
 import math
+import multiprocessing
+import os
+import queue
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from distancias import calcular_matriz_distancias, coordenadas_de, registrar_matriz_transito
+from instancias import AlmacenInstancias, ProblemasPerezosos
+from vecinos import IndiceVecinos
+from parada import PoliticaParada
+from mejora_rutas import mejorar_solucion
+from descomposicion import (asignar_clientes, clientes_frontera, combinar_soluciones,
+                             depositos_activos, insertar_mas_barato, reparar_fronteras,
+                             subproblemas, vehiculos_por_deposito)
+
+# Combinaciones que compiten por defecto en resolver_carrera
+ESTRATEGIAS_CARRERA = ('SAVINGS', 'CHRISTOFIDES', 'PARALLEL_CHEAPEST_INSERTION')
+METAHEURISTICAS_CARRERA = ('GUIDED_LOCAL_SEARCH', 'TABU_SEARCH', 'SIMULATED_ANNEALING')
 
 class ResolveMDVRP:
-    def __init__(self, ruta_excel):
+    def __init__(self, ruta_excel, usar_cache=True, directorio_cache=None,
+                 perezoso=False, max_problemas_en_memoria=None, problemas=None):
         self.ruta_excel = ruta_excel
+        self.usar_cache = usar_cache
+        self.directorio_cache = directorio_cache
+        self.max_problemas_en_memoria = max_problemas_en_memoria
         self.problemas = {}
-        self.cargar_datos()
+        self._almacen = None
+        self._xls = None
+        self._hojas = None
+        if problemas is not None:
+            # Problemas ya procesados (p. ej. enviados a un proceso del pool)
+            self.problemas = dict(problemas)
+        elif perezoso:
+            self.cargar_datos_perezoso()
+        else:
+            self.cargar_datos()
         
     def cargar_datos(self):
-        """Cargar todas las hojas de problemas desde el archivo Excel"""
+        """Cargar todas las hojas de problemas desde el almacén en disco o el archivo Excel"""
         try:
+            almacen = None
+            if self.usar_cache:
+                almacen = AlmacenInstancias(self.ruta_excel, self.directorio_cache)
+                problemas = almacen.cargar_todos()
+                if problemas is not None:
+                    self.problemas = problemas
+                    print(f"{len(problemas)} problemas cargados desde el almacén {almacen.directorio_clave}")
+                    return
+            
             xls = pd.ExcelFile(self.ruta_excel)
             print(f"Hojas disponibles: {xls.sheet_names}")
             
@@ -23,11 +63,70 @@ class ResolveMDVRP:
                     numero_problema = int(nombre_hoja.split()[1])
                     self.problemas[numero_problema] = self.procesar_hoja_problema(df)
                     print(f"Problema {numero_problema} cargado correctamente")
+            
+            if almacen is not None:
+                self.guardar_cache(almacen)
+        except Exception as e:
+            print(f"Error al cargar el archivo Excel: {e}")
+            # Crear datos de ejemplo si falla la carga
+            self.crear_datos_ejemplo()
+    
+    def cargar_datos_perezoso(self):
+        """Registrar los problemas disponibles sin procesar ninguna hoja todavía"""
+        try:
+            if self.usar_cache:
+                self._almacen = AlmacenInstancias(self.ruta_excel, self.directorio_cache)
+            indice = self._almacen.leer_indice() if self._almacen is not None else None
+            
+            if indice is not None:
+                numeros = sorted(indice)
+            else:
+                self._abrir_excel()
+                numeros = list(self._hojas)
+            
+            self.problemas = ProblemasPerezosos(numeros, self.cargar_problema,
+                                                self.max_problemas_en_memoria)
+            print(f"{len(numeros)} problemas disponibles (carga bajo demanda)")
         except Exception as e:
             print(f"Error al cargar el archivo Excel: {e}")
             # Crear datos de ejemplo si falla la carga
             self.crear_datos_ejemplo()
     
+    def _abrir_excel(self):
+        """Abrir el libro y ubicar la hoja de cada problema"""
+        self._xls = pd.ExcelFile(self.ruta_excel)
+        self._hojas = {
+            int(nombre_hoja.split()[1]): nombre_hoja
+            for nombre_hoja in self._xls.sheet_names
+            if nombre_hoja.startswith('Problem')
+        }
+    
+    def cargar_problema(self, numero_problema):
+        """Procesar un único problema, desde el almacén si ya fue guardado"""
+        if self._almacen is not None and self._almacen.contiene(numero_problema):
+            return self._almacen.cargar(numero_problema)
+        
+        if self._hojas is None:
+            self._abrir_excel()
+        df = pd.read_excel(self._xls, sheet_name=self._hojas[numero_problema])
+        problema = self.procesar_hoja_problema(df)
+        print(f"Problema {numero_problema} cargado correctamente")
+        
+        if self._almacen is not None and problema is not None:
+            try:
+                self._almacen.guardar(numero_problema, problema)
+            except Exception as e:
+                print(f"No se pudo guardar el problema {numero_problema} en el almacén: {e}")
+        return problema
+    
+    def guardar_cache(self, almacen):
+        """Guardar los problemas procesados para que la siguiente carga no lea el Excel"""
+        try:
+            almacen.guardar_todos(self.problemas)
+            print(f"Almacén de instancias guardado en {almacen.directorio_clave}")
+        except Exception as e:
+            print(f"No se pudo guardar el almacén de instancias: {e}")
+    
     def crear_datos_ejemplo(self):
         """Crear datos de ejemplo para pruebas cuando el archivo Excel no esté disponible"""
         print("Creando datos de ejemplo...")
@@ -105,24 +204,15 @@ class ResolveMDVRP:
             print(f"Error procesando hoja: {e}")
             return None
     
-    def matriz_distancias(self, numero_problema):
+    def matriz_distancias(self, numero_problema, dtype=np.int64, escala=None):
         """Crear matriz de distancias para un problema dado"""
         problema = self.problemas[numero_problema]
         ubicaciones = problema['depositos'] + problema['clientes']
-        num_ubicaciones = len(ubicaciones)
-        
-        # Crear matriz de distancias
-        matriz_distancias = np.zeros((num_ubicaciones, num_ubicaciones), dtype=int)
         
-        for i in range(num_ubicaciones):
-            for j in range(num_ubicaciones):
-                if i == j:
-                    matriz_distancias[i][j] = 0
-                else:
-                    ubicacion1 = ubicaciones[i]
-                    ubicacion2 = ubicaciones[j]
-                    # Convertir a entero para OR-Tools
-                    matriz_distancias[i][j] = int(self.distancia_euclidiana(ubicacion1, ubicacion2))
+        # Matriz completa en un solo paso vectorizado; entera para OR-Tools
+        matriz_distancias = calcular_matriz_distancias(
+            coordenadas_de(ubicaciones), dtype=dtype, escala=escala, simetrica=True
+        )
         
         return matriz_distancias, ubicaciones
     
@@ -130,16 +220,20 @@ class ResolveMDVRP:
         """Calcular distancia euclidiana entre dos puntos"""
         return math.sqrt((ubicacion1['x'] - ubicacion2['x'])**2 + (ubicacion1['y'] - ubicacion2['y'])**2)
     
-    def resolver_problema(self, numero_problema, num_vehiculos=1):
-        """Resolver una instancia específica del problema"""
-        if numero_problema not in self.problemas:
-            print(f"Problema {numero_problema} no encontrado")
-            return None
-            
+    def construir_modelo(self, numero_problema, num_vehiculos=1, k_vecinos=None):
+        """Crear administrador y modelo de enrutamiento con sus restricciones
+        
+        Devuelve (administrador, enrutamiento, ubicaciones, num_depositos, total_vehiculos,
+        matriz_distancias, indice_vecinos); indice_vecinos (sobre depósitos y
+        clientes) es None sin k_vecinos.
+        """
         problema = self.problemas[numero_problema]
-        matriz_distancias, ubicaciones = self.matriz_distancias(numero_problema)
         num_depositos = problema['num_depositos']
         num_clientes = len(problema['clientes'])
+        matriz_distancias, ubicaciones = self.matriz_distancias(numero_problema)
+        indice_vecinos = None
+        if k_vecinos is not None:
+            indice_vecinos = IndiceVecinos(coordenadas_de(ubicaciones), k_vecinos)
         
         print(f"Resolviendo problema con {num_depositos} depósitos y {num_clientes} clientes")
         print(f"Total de ubicaciones: {len(ubicaciones)}")
@@ -148,11 +242,12 @@ class ResolveMDVRP:
         # CORRECCIÓN: Usar solo un vehículo por depósito inicialmente
         total_vehiculos = min(num_vehiculos, num_clientes)  # No más vehículos que clientes
         
-        # Los depósitos son los índices de inicio/fin
-        indices_depositos = list(range(num_depositos))
+        # Los depósitos son los índices de inicio/fin; cada vehículo sale del
+        # depósito id_vehiculo % num_depositos, igual que en procesar_solucion
+        indices_depositos = [id_vehiculo % num_depositos for id_vehiculo in range(total_vehiculos)]
         
         administrador = pywrapcp.RoutingIndexManager(
-            len(matriz_distancias), 
+            len(ubicaciones), 
             total_vehiculos,
             indices_depositos,  # inicios
             indices_depositos   # finales
@@ -161,13 +256,11 @@ class ResolveMDVRP:
         # Crear modelo de enrutamiento
         enrutamiento = pywrapcp.RoutingModel(administrador)
         
-        def callback_distancia(desde_indice, hasta_indice):
-            """Devuelve la distancia entre los dos nodos"""
-            desde_nodo = administrador.IndexToNode(desde_indice)
-            hasta_nodo = administrador.IndexToNode(hasta_indice)
-            return int(matriz_distancias[desde_nodo][hasta_nodo])
-        
-        indice_callback_transito = enrutamiento.RegisterTransitCallback(callback_distancia)
+        # Matriz de tránsito nativa: OR-Tools no llama a Python por cada arco
+        indice_callback_transito = registrar_matriz_transito(enrutamiento, matriz_distancias)
+        if indice_vecinos is not None:
+            self._restringir_a_vecinos(administrador, enrutamiento, indice_vecinos, num_depositos,
+                                       indices_depositos)
         
         # Definir costo de cada arco
         enrutamiento.SetArcCostEvaluatorOfAllVehicles(indice_callback_transito)
@@ -188,28 +281,438 @@ class ResolveMDVRP:
         for nodo in range(num_depositos, len(ubicaciones)):
             enrutamiento.AddDisjunction([administrador.NodeToIndex(nodo)], 1000000)
         
+        return (administrador, enrutamiento, ubicaciones, num_depositos, total_vehiculos,
+                matriz_distancias, indice_vecinos)
+    
+    def _restringir_a_vecinos(self, administrador, enrutamiento, indice_vecinos, num_depositos,
+                              indices_depositos):
+        """Limitar los sucesores de cada cliente a sus k vecinos más cercanos
+        
+        indice_vecinos cubre depósitos y clientes: un cliente puede seguir hacia
+        sus clientes vecinos o terminar la ruta en un depósito vecino, y siempre
+        en su depósito más cercano. Los inicios de ruta conservan todos los clientes.
+        """
+        finales_por_deposito = {}
+        for id_vehiculo, deposito in enumerate(indices_depositos):
+            finales_por_deposito.setdefault(deposito, []).append(enrutamiento.End(id_vehiculo))
+        
+        coordenadas = indice_vecinos.coordenadas
+        for nodo, vecinos in enumerate(indice_vecinos.vecinos_simetricos()):
+            if nodo < num_depositos:
+                continue
+            diferencias = coordenadas[:num_depositos] - coordenadas[nodo]
+            depositos = {int(np.argmin(np.einsum('ij,ij->i', diferencias, diferencias)))}
+            depositos.update(vecino for vecino in vecinos if vecino < num_depositos)
+            indice = administrador.NodeToIndex(nodo)
+            permitidos = [administrador.NodeToIndex(vecino) for vecino in vecinos if vecino >= num_depositos]
+            for deposito in depositos:
+                # Un depósito sin vehículos es un nodo más que hay que visitar
+                permitidos += finales_por_deposito.get(deposito) or [administrador.NodeToIndex(deposito)]
+            # El propio índice permite dejar el cliente sin visitar (disyunción)
+            enrutamiento.NextVar(indice).SetValues(permitidos + [indice])
+    
+    def resolver_problema(self, numero_problema, num_vehiculos=1, tiempo_limite=30, k_vecinos=None,
+                          rutas_iniciales=None, al_encontrar=None, parada=None,
+                          estrategia_inicial='PATH_CHEAPEST_ARC', metaheuristica='GUIDED_LOCAL_SEARCH',
+                          pulir=False):
+        """Resolver una instancia específica del problema
+        
+        k_vecinos: si se indica, cada cliente solo puede continuar hacia sus
+            k ubicaciones más cercanas (clientes, o el final de ruta en un
+            depósito vecino o en el más cercano), y la búsqueda local solo
+            prueba esos vecinos. Los costos siguen en la matriz de tránsito nativa.
+        rutas_iniciales: lista 'rutas' de una solución anterior (procesar_solucion)
+            desde la que arranca la búsqueda; los clientes que ya no existen se
+            descartan y los nuevos se insertan donde menos alargan una ruta.
+        al_encontrar: función que recibe cada solución que mejora la anterior
+            como {'objetivo', 'tiempo_s', 'solucion'}, con 'solucion' en el
+            formato de procesar_solucion.
+        parada: PoliticaParada; reemplaza tiempo_limite por su presupuesto y
+            agrega a la solución 'criterio_parada', 'tiempo_busqueda_s',
+            'tiempo_primera_solucion_s' y 'soluciones_encontradas'.
+        estrategia_inicial / metaheuristica: nombres de FirstSolutionStrategy y
+            LocalSearchMetaheuristic de OR-Tools.
+        pulir: pasar la solución por mejora_rutas (2-opt, Or-opt, relocate,
+            exchange); permite un tiempo_limite mucho menor.
+        """
+        if numero_problema not in self.problemas:
+            print(f"Problema {numero_problema} no encontrado")
+            return None
+        
+        modelo = self.construir_modelo(numero_problema, num_vehiculos, k_vecinos)
+        administrador, enrutamiento, ubicaciones, num_depositos, total_vehiculos = modelo[:5]
+        matriz_distancias, indice_vecinos = modelo[5:]
+        
         # Configurar heurística de primera solución
         parametros_busqueda = pywrapcp.DefaultRoutingSearchParameters()
-        parametros_busqueda.first_solution_strategy = (
-            routing_enums_pb2.FirstSolutionStrategy.PATH_CHEAPEST_ARC
+        parametros_busqueda.first_solution_strategy = getattr(
+            routing_enums_pb2.FirstSolutionStrategy, estrategia_inicial
         )
-        parametros_busqueda.local_search_metaheuristic = (
-            routing_enums_pb2.LocalSearchMetaheuristic.GUIDED_LOCAL_SEARCH
+        parametros_busqueda.local_search_metaheuristic = getattr(
+            routing_enums_pb2.LocalSearchMetaheuristic, metaheuristica
         )
-        parametros_busqueda.time_limit.FromSeconds(30)  # Más tiempo
+        monitor = None
+        if parada is not None:
+            tiempo_limite = parada.presupuesto(len(ubicaciones) - num_depositos)
+            monitor = self._aplicar_parada(enrutamiento, parametros_busqueda, parada, tiempo_limite)
+        parametros_busqueda.time_limit.FromMilliseconds(int(tiempo_limite * 1000))
+        if k_vecinos is not None:
+            # Los operadores de búsqueda local solo prueban los vecinos más cercanos
+            num_nodos = len(ubicaciones)
+            parametros_busqueda.ls_operator_neighbors_ratio = min(1.0, k_vecinos / num_nodos)
+            parametros_busqueda.ls_operator_min_neighbors = min(k_vecinos, num_nodos)
+        
+        if al_encontrar is not None:
+            self._reportar_soluciones(numero_problema, administrador, enrutamiento, ubicaciones,
+                                      num_depositos, total_vehiculos, al_encontrar)
         
         # Resolver el problema
         print("Iniciando resolución...")
-        solucion = enrutamiento.SolveWithParameters(parametros_busqueda)
+        asignacion_inicial = None
+        if rutas_iniciales is not None:
+            enrutamiento.CloseModelWithParameters(parametros_busqueda)
+            try:
+                asignacion_inicial = self.asignacion_desde_rutas(
+                    administrador, enrutamiento, ubicaciones, num_depositos, total_vehiculos, rutas_iniciales
+                )
+            except ValueError as error:
+                print(f"{error}; se resuelve desde cero")
+        if monitor is not None:
+            monitor.iniciar()
+        if asignacion_inicial is not None:
+            solucion = enrutamiento.SolveFromAssignmentWithParameters(asignacion_inicial, parametros_busqueda)
+        else:
+            solucion = enrutamiento.SolveWithParameters(parametros_busqueda)
         
         # Procesar y devolver solución
         if solucion:
             print("¡Solución encontrada!")
-            return self.procesar_solucion(numero_problema, administrador, enrutamiento, solucion, ubicaciones, num_depositos, total_vehiculos)
+            resultado = self.procesar_solucion(numero_problema, administrador, enrutamiento, solucion, ubicaciones, num_depositos, total_vehiculos)
+            if monitor is not None:
+                resultado.update(monitor.resumen())
+                print(f"Búsqueda detenida por: {resultado['criterio_parada']}")
+            if pulir:
+                distancia_antes = resultado['distancia_total']
+                # Mismas distancias y vecinos que el modelo: no se rehace la matriz
+                resultado = mejorar_solucion(resultado, matriz=matriz_distancias, vecinos=indice_vecinos)
+                print(f"Pulido: {distancia_antes} -> {resultado['distancia_total']}")
+            return resultado
         else:
             print("No se encontró solución")
             return None
     
+    def _aplicar_parada(self, enrutamiento, parametros_busqueda, parada, presupuesto):
+        """Registrar los criterios de una PoliticaParada en el modelo y los parámetros"""
+        monitor = parada.monitor(presupuesto)
+        if parada.max_soluciones is not None:
+            parametros_busqueda.solution_limit = parada.max_soluciones
+        enrutamiento.AddAtSolutionCallback(lambda: monitor.registrar(enrutamiento.CostVar().Max()))
+        if parada.sin_mejora_s is not None or parada.mejora_relativa is not None:
+            enrutamiento.AddSearchMonitor(enrutamiento.solver().CustomLimit(monitor.debe_parar))
+        return monitor
+    
+    def _reportar_soluciones(self, numero_problema, administrador, enrutamiento, ubicaciones,
+                             num_depositos, total_vehiculos, al_encontrar):
+        """Llamar a al_encontrar con cada solución que mejora el objetivo durante la búsqueda"""
+        inicio = time.perf_counter()
+        mejor = [None]
+        
+        def en_solucion():
+            objetivo = enrutamiento.CostVar().Max()
+            if mejor[0] is not None and objetivo >= mejor[0]:
+                return
+            mejor[0] = objetivo
+            solucion = self.procesar_solucion(numero_problema, administrador, enrutamiento,
+                                              _AsignacionActual(), ubicaciones, num_depositos,
+                                              total_vehiculos)
+            al_encontrar({
+                'objetivo': objetivo,
+                'tiempo_s': time.perf_counter() - inicio,
+                'solucion': solucion
+            })
+        
+        enrutamiento.AddAtSolutionCallback(en_solucion)
+    
+    def resolver_en_vivo(self, numero_problema, num_vehiculos=1, tiempo_limite=30, **opciones):
+        """Generador de las soluciones que mejoran mientras el solver sigue buscando
+        
+        La búsqueda corre en otro proceso: OR-Tools no libera el GIL mientras
+        busca, así que un hilo dejaría al consumidor esperando hasta el final.
+        Cerrar el generador (break, close()) termina la búsqueda en el acto.
+        opciones se pasan a resolver_problema (k_vecinos, rutas_iniciales).
+        """
+        proceso, cola = self._iniciar_en_vivo(numero_problema, num_vehiculos, tiempo_limite, opciones)
+        try:
+            while True:
+                evento = _siguiente_evento(proceso, cola)
+                if evento is None:
+                    break
+                yield evento
+        finally:
+            _terminar_proceso(proceso)
+    
+    async def resolver_en_vivo_async(self, numero_problema, num_vehiculos=1, tiempo_limite=30, **opciones):
+        """Versión async de resolver_en_vivo; la espera no bloquea el bucle de eventos"""
+        proceso, cola = self._iniciar_en_vivo(numero_problema, num_vehiculos, tiempo_limite, opciones)
+        bucle = asyncio.get_running_loop()
+        try:
+            while True:
+                evento = await bucle.run_in_executor(None, _siguiente_evento, proceso, cola)
+                if evento is None:
+                    break
+                yield evento
+        finally:
+            _terminar_proceso(proceso)
+    
+    def resolver_carrera(self, numero_problema, num_vehiculos=1, tiempo_limite=30, estrategias=None,
+                         metaheuristicas=None, num_procesos=None, margen=0.05, gracia=0.2, **opciones):
+        """Hacer competir combinaciones de estrategia inicial y metaheurística
+        
+        Cada combinación corre en su propio proceso (como máximo num_procesos a
+        la vez; las demás esperan un lugar libre). Pasada la fracción gracia de
+        tiempo_limite, se elimina cada combinación cuyo mejor objetivo supere
+        en más de margen al del líder, o que aún no tenga solución.
+        
+        Devuelve la mejor solución (formato de procesar_solucion) con
+        'estrategia_inicial', 'metaheuristica' y 'carrera', el resumen de
+        cada combinación.
+        """
+        if numero_problema not in self.problemas:
+            print(f"Problema {numero_problema} no encontrado")
+            return None
+        
+        pendientes = [(estrategia, metaheuristica)
+                      for estrategia in (estrategias or ESTRATEGIAS_CARRERA)
+                      for metaheuristica in (metaheuristicas or METAHEURISTICAS_CARRERA)]
+        num_procesos = num_procesos or len(pendientes)
+        corredores = {}
+        inicio = time.perf_counter()
+        fin = inicio + tiempo_limite
+        print(f"Carrera de {len(pendientes)} combinaciones, {num_procesos} a la vez...")
+        
+        while True:
+            ahora = time.perf_counter()
+            corriendo = [c for c in corredores.values() if c['estado'] == 'corriendo']
+            
+            # Lanzar combinaciones mientras haya lugar y tiempo
+            while pendientes and len(corriendo) < num_procesos and ahora < fin:
+                estrategia, metaheuristica = pendientes.pop(0)
+                proceso, cola = self._iniciar_en_vivo(
+                    numero_problema, num_vehiculos, fin - ahora,
+                    dict(opciones, estrategia_inicial=estrategia, metaheuristica=metaheuristica)
+                )
+                corredor = {'proceso': proceso, 'cola': cola, 'inicio': ahora, 'mejor': None, 'estado': 'corriendo'}
+                corredores[(estrategia, metaheuristica)] = corredor
+                corriendo.append(corredor)
+            if not corriendo and (not pendientes or ahora >= fin):
+                break
+            
+            for corredor in corriendo:
+                _leer_mejoras(corredor)
+            
+            # Eliminar a los rezagados una vez pasada la gracia
+            objetivos = [c['mejor']['objetivo'] for c in corredores.values() if c['mejor']]
+            if objetivos:
+                lider = min(objetivos)
+                for corredor in corriendo:
+                    if corredor['estado'] != 'corriendo' or ahora - corredor['inicio'] < gracia * tiempo_limite:
+                        continue
+                    if corredor['mejor'] is None or corredor['mejor']['objetivo'] > lider * (1 + margen):
+                        _terminar_proceso(corredor['proceso'])
+                        corredor['estado'] = 'eliminada'
+            
+            # Red de seguridad si algún proceso no respeta su límite de tiempo
+            if ahora > fin + 5:
+                for corredor in corriendo:
+                    if corredor['estado'] == 'corriendo':
+                        _terminar_proceso(corredor['proceso'])
+                        corredor['estado'] = 'tiempo'
+            time.sleep(0.05)
+        
+        resumen = [
+            {
+                'estrategia_inicial': estrategia,
+                'metaheuristica': metaheuristica,
+                'objetivo': c['mejor']['objetivo'] if c['mejor'] else None,
+                'estado': c['estado']
+            }
+            for (estrategia, metaheuristica), c in corredores.items()
+        ]
+        con_solucion = [(c['mejor']['objetivo'], config) for config, c in corredores.items() if c['mejor']]
+        if not con_solucion:
+            print("No se encontró solución")
+            return None
+        
+        _, ganadora = min(con_solucion)
+        solucion = dict(corredores[ganadora]['mejor']['solucion'])
+        solucion['estrategia_inicial'], solucion['metaheuristica'] = ganadora
+        solucion['carrera'] = resumen
+        print(f"Ganadora: {ganadora[0]} + {ganadora[1]} "
+              f"(distancia {solucion['distancia_total']}, {time.perf_counter() - inicio:.1f} s)")
+        return solucion
+    
+    def _iniciar_en_vivo(self, numero_problema, num_vehiculos, tiempo_limite, opciones):
+        if numero_problema not in self.problemas:
+            raise KeyError(f"Problema {numero_problema} no encontrado")
+        contexto = multiprocessing.get_context()
+        cola = contexto.Queue()
+        tarea = (numero_problema, self.problemas[numero_problema], num_vehiculos, tiempo_limite, opciones)
+        proceso = contexto.Process(target=_resolver_con_reportes, args=(tarea, cola), daemon=True)
+        proceso.start()
+        return proceso, cola
+    
+    def asignacion_desde_rutas(self, administrador, enrutamiento, ubicaciones, num_depositos,
+                               total_vehiculos, rutas):
+        """Convertir rutas de procesar_solucion en una asignación inicial de OR-Tools
+        
+        Cada ruta se asigna a su vehículo si sigue existiendo y sale del mismo
+        depósito; si no, a otro vehículo libre de ese depósito. Las rutas sin
+        vehículo disponible se descartan. Lanza ValueError si un cliente no
+        cabe en ninguna ruta o si OR-Tools rechaza las rutas resultantes.
+        """
+        nodos = {ubicacion['id']: nodo for nodo, ubicacion in enumerate(ubicaciones)}
+        deposito_de = [ubicaciones[id_vehiculo % num_depositos]['id'] for id_vehiculo in range(total_vehiculos)]
+        secuencias = [[] for _ in range(total_vehiculos)]
+        libres = set(range(total_vehiculos))
+        
+        pendientes = []
+        for ruta in rutas:
+            id_vehiculo = ruta['id_vehiculo']
+            if id_vehiculo in libres and deposito_de[id_vehiculo] == ruta['deposito']:
+                libres.discard(id_vehiculo)
+                secuencias[id_vehiculo] = ruta['ruta'][1:-1]
+            else:
+                pendientes.append(ruta)
+        for ruta in pendientes:
+            id_vehiculo = next((v for v in sorted(libres) if deposito_de[v] == ruta['deposito']), None)
+            if id_vehiculo is not None:
+                libres.discard(id_vehiculo)
+                secuencias[id_vehiculo] = ruta['ruta'][1:-1]
+        
+        # Solo clientes que siguen en el problema
+        secuencias = [[nodos[i] for i in secuencia if nodos.get(i, -1) >= num_depositos]
+                      for secuencia in secuencias]
+        
+        # Los clientes nuevos se insertan donde menos alargan una ruta; la
+        # búsqueda local por sí sola casi nunca activa nodos no visitados
+        visitados = {nodo for secuencia in secuencias for nodo in secuencia}
+        posiciones = [(u['x'], u['y']) for u in ubicaciones]
+        depositos = [id_vehiculo % num_depositos for id_vehiculo in range(total_vehiculos)]
+        for nodo in range(num_depositos, len(ubicaciones)):
+            if nodo not in visitados and not insertar_mas_barato(secuencias, nodo, posiciones, depositos):
+                raise ValueError(f"El cliente {ubicaciones[nodo]['id']} no cabe en ninguna ruta inicial "
+                                 f"sin superar la distancia máxima")
+        
+        indices = [[administrador.NodeToIndex(nodo) for nodo in secuencia] for secuencia in secuencias]
+        asignacion = enrutamiento.ReadAssignmentFromRoutes(indices, True)
+        if asignacion is None:
+            raise ValueError("OR-Tools rechazó las rutas iniciales (arco fuera de los vecinos "
+                             "permitidos o distancia máxima superada)")
+        return asignacion
+    
+    def resolver_descompuesto(self, numero_problema, num_vehiculos=None, tiempo_limite=30,
+                              asignacion='cercano', reparar=True, num_procesos=None):
+        """Resolver agrupando primero y enrutando después
+        
+        Cada cliente se asigna a un depósito ('cercano' o 'balanceado'), cada
+        depósito se resuelve como un VRP independiente en su propio proceso y,
+        si reparar es True, se reubican los clientes de frontera entre rutas de
+        depósitos distintos. Devuelve el mismo diccionario que procesar_solucion.
+        """
+        if numero_problema not in self.problemas:
+            print(f"Problema {numero_problema} no encontrado")
+            return None
+        
+        problema = self.problemas[numero_problema]
+        num_depositos = problema['num_depositos']
+        if num_vehiculos is None:
+            num_vehiculos = num_depositos
+        total_vehiculos = min(num_vehiculos, len(problema['clientes']))
+        depositos = depositos_activos(num_depositos, total_vehiculos)
+        vehiculos_deposito = vehiculos_por_deposito(num_depositos, total_vehiculos)
+        
+        asignados, distancias = asignar_clientes(problema, depositos, asignacion)
+        partes = subproblemas(problema, asignados)
+        print(f"Resolviendo {len(partes)} subproblemas de un depósito "
+              f"({', '.join(str(len(p['clientes'])) for p in partes.values())} clientes)")
+        
+        tareas = [(deposito, parte, len(vehiculos_deposito[deposito]), tiempo_limite, None)
+                  for deposito, parte in partes.items()]
+        soluciones_deposito = {}
+        num_procesos = num_procesos or min(len(tareas), os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=num_procesos) as pool:
+            for deposito, solucion, _ in pool.map(_resolver_en_proceso, tareas):
+                soluciones_deposito[deposito] = solucion
+        
+        solucion = combinar_soluciones(numero_problema, problema, soluciones_deposito, vehiculos_deposito)
+        if reparar:
+            posiciones = {u['id']: (u['x'], u['y']) for u in solucion['ubicaciones']}
+            frontera = clientes_frontera(problema, asignados, distancias, depositos)
+            movidos = reparar_fronteras(solucion['rutas'], posiciones, frontera)
+            solucion['distancia_total'] = sum(r['distancia'] for r in solucion['rutas'])
+            solucion['num_vehiculos_usados'] = len(solucion['rutas'])
+            print(f"Reparación de fronteras: {movidos} de {len(frontera)} clientes reubicados")
+        return solucion
+    
+    def resolver_lote(self, numeros_problema=None, num_vehiculos=None, tiempo_limite=30, num_procesos=None,
+                      parada=None):
+        """Resolver varios problemas en paralelo, uno por proceso
+        
+        numeros_problema: lista de problemas a resolver (todos si es None).
+        num_vehiculos / tiempo_limite: valor común o diccionario por problema;
+            sin num_vehiculos se usa un vehículo por depósito.
+        num_procesos: procesos del pool (por defecto, uno por núcleo).
+        parada: PoliticaParada común a todos los problemas (ver resolver_problema).
+        
+        Devuelve (tabla, soluciones): un DataFrame con distancia, vehículos
+        usados y tiempo de cada problema, y las soluciones de procesar_solucion.
+        """
+        if numeros_problema is None:
+            numeros_problema = list(self.problemas)
+        
+        def valor_para(parametro, numero_problema, por_defecto):
+            if isinstance(parametro, dict):
+                return parametro.get(numero_problema, por_defecto)
+            return por_defecto if parametro is None else parametro
+        
+        tareas = []
+        filas = []
+        for numero_problema in numeros_problema:
+            problema = self.problemas.get(numero_problema)
+            if problema is None:
+                filas.append(_fila_lote(numero_problema, 'no encontrado'))
+                continue
+            tareas.append((
+                numero_problema,
+                problema,
+                valor_para(num_vehiculos, numero_problema, problema['num_depositos']),
+                valor_para(tiempo_limite, numero_problema, 30),
+                parada
+            ))
+        
+        soluciones = {}
+        num_procesos = num_procesos or os.cpu_count() or 1
+        print(f"Resolviendo {len(tareas)} problemas con {num_procesos} procesos...")
+        inicio = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=num_procesos) as pool:
+            futuros = {pool.submit(_resolver_en_proceso, tarea): tarea[0] for tarea in tareas}
+            for futuro in as_completed(futuros):
+                numero_problema = futuros[futuro]
+                try:
+                    _, solucion, tiempo = futuro.result()
+                except Exception as e:
+                    print(f"Error resolviendo el problema {numero_problema}: {e}")
+                    filas.append(_fila_lote(numero_problema, f'error: {e}'))
+                    continue
+                soluciones[numero_problema] = solucion
+                filas.append(_fila_lote(numero_problema, 'resuelto' if solucion else 'sin solución',
+                                        solucion, tiempo))
+        print(f"Lote terminado en {time.perf_counter() - inicio:.1f} s")
+        
+        # Con columns explícitas un lote vacío da una tabla vacía en lugar de un KeyError
+        tabla = pd.DataFrame(filas, columns=COLUMNAS_LOTE).sort_values('numero_problema').reset_index(drop=True)
+        return tabla, soluciones
+    
     def procesar_solucion(self, numero_problema, administrador, enrutamiento, solucion, ubicaciones, num_depositos, num_vehiculos):
         """Procesar la solución en un formato legible"""
         problema = self.problemas[numero_problema]
@@ -319,6 +822,76 @@ class ResolveMDVRP:
             if len(problema['clientes']) > 5:
                 print(f"    ... y {len(problema['clientes'])-5} clientes más")
 
+COLUMNAS_LOTE = ['numero_problema', 'estado', 'distancia_total', 'num_vehiculos_usados', 'tiempo_s',
+                 'criterio_parada']
+
+def _fila_lote(numero_problema, estado, solucion=None, tiempo=None):
+    """Fila de la tabla de resultados de resolver_lote"""
+    return {
+        'numero_problema': numero_problema,
+        'estado': estado,
+        'distancia_total': solucion['distancia_total'] if solucion else None,
+        'num_vehiculos_usados': solucion['num_vehiculos_usados'] if solucion else None,
+        'tiempo_s': tiempo,
+        'criterio_parada': solucion.get('criterio_parada') if solucion else None
+    }
+
+def _resolver_en_proceso(tarea):
+    """Resolver un problema dentro de un proceso del pool con su propio RoutingModel"""
+    numero_problema, problema, num_vehiculos, tiempo_limite, parada = tarea
+    resolvedor = ResolveMDVRP(None, problemas={numero_problema: problema})
+    inicio = time.perf_counter()
+    solucion = resolvedor.resolver_problema(numero_problema, num_vehiculos=num_vehiculos,
+                                            tiempo_limite=tiempo_limite, parada=parada)
+    return numero_problema, solucion, time.perf_counter() - inicio
+
+class _AsignacionActual:
+    """Lee los valores de las variables durante un callback de solución"""
+    def Value(self, variable):
+        return variable.Value()
+
+def _resolver_con_reportes(tarea, cola):
+    """Resolver en un proceso hijo enviando cada mejora por la cola; None marca el final"""
+    numero_problema, problema, num_vehiculos, tiempo_limite, opciones = tarea
+    try:
+        resolvedor = ResolveMDVRP(None, problemas={numero_problema: problema})
+        resolvedor.resolver_problema(numero_problema, num_vehiculos=num_vehiculos,
+                                     tiempo_limite=tiempo_limite, al_encontrar=cola.put, **opciones)
+    finally:
+        cola.put(None)
+
+def _siguiente_evento(proceso, cola, intervalo=0.5):
+    """Esperar la siguiente mejora; None si la búsqueda terminó"""
+    while True:
+        try:
+            return cola.get(timeout=intervalo)
+        except queue.Empty:
+            if not proceso.is_alive():
+                try:
+                    return cola.get(timeout=intervalo)
+                except queue.Empty:
+                    return None
+
+def _leer_mejoras(corredor):
+    """Vaciar la cola de un corredor de resolver_carrera sin bloquear"""
+    while True:
+        try:
+            evento = corredor['cola'].get_nowait()
+        except queue.Empty:
+            if not corredor['proceso'].is_alive() and corredor['cola'].empty():
+                corredor['estado'] = 'terminada'
+            return
+        if evento is None:
+            corredor['estado'] = 'terminada'
+            corredor['proceso'].join()
+            return
+        corredor['mejor'] = evento
+
+def _terminar_proceso(proceso):
+    if proceso.is_alive():
+        proceso.terminate()
+    proceso.join()
+
 # Ejemplo de uso
 if __name__ == "__main__":
     # Inicializar el resolvedor con el archivo Excel
@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+
+from distancias import _bloque_distancias, coordenadas_de
+
+
+def depositos_activos(num_depositos, total_vehiculos):
+    """Depósitos que tienen al menos un vehículo (el vehículo v sale de v % num_depositos)"""
+    return list(range(min(num_depositos, total_vehiculos)))
+
+
+def vehiculos_por_deposito(num_depositos, total_vehiculos):
+    """Ids globales de los vehículos de cada depósito, en el orden del modelo completo"""
+    return {
+        deposito: list(range(deposito, total_vehiculos, num_depositos))
+        for deposito in depositos_activos(num_depositos, total_vehiculos)
+    }
+
+
+def asignar_clientes(problema, depositos=None, modo='cercano'):
+    """Asignar cada cliente a un depósito
+
+    modo 'cercano': el depósito más cercano.
+    modo 'balanceado': como máximo ceil(clientes / depósitos) clientes por
+        depósito; se asignan primero los clientes con mayor arrepentimiento
+        (diferencia entre su segundo y su primer depósito más cercano).
+
+    Devuelve un arreglo con el índice de depósito de cada cliente y la matriz
+    de distancias clientes x depósitos.
+    """
+    if depositos is None:
+        depositos = list(range(problema['num_depositos']))
+    depositos = np.asarray(depositos)
+    distancias = _bloque_distancias(coordenadas_de(problema['clientes']),
+                                    coordenadas_de([problema['depositos'][d] for d in depositos]))
+    if modo == 'cercano':
+        return depositos[np.argmin(distancias, axis=1)], distancias
+    if modo != 'balanceado':
+        raise ValueError(f"Modo de asignación desconocido: {modo}")
+
+    num_clientes = len(distancias)
+    capacidad = np.full(len(depositos), math.ceil(num_clientes / len(depositos)))
+    preferencias = np.argsort(distancias, axis=1, kind='stable')
+    if len(depositos) > 1:
+        ordenadas = np.take_along_axis(distancias, preferencias[:, :2], axis=1)
+        arrepentimiento = ordenadas[:, 1] - ordenadas[:, 0]
+    else:
+        arrepentimiento = np.zeros(num_clientes)
+
+    asignacion = np.empty(num_clientes, dtype=np.int64)
+    for cliente in np.argsort(-arrepentimiento, kind='stable'):
+        for columna in preferencias[cliente]:
+            if capacidad[columna] > 0:
+                capacidad[columna] -= 1
+                asignacion[cliente] = depositos[columna]
+                break
+    return asignacion, distancias
+
+
+def subproblemas(problema, asignacion):
+    """Dividir el problema en un problema de un solo depósito por depósito con clientes"""
+    return {
+        int(deposito): {
+            'depositos': [problema['depositos'][deposito]],
+            'clientes': [problema['clientes'][i] for i in np.flatnonzero(asignacion == deposito)],
+            'num_depositos': 1
+        }
+        for deposito in np.unique(asignacion)
+    }
+
+
+def clientes_frontera(problema, asignacion, distancias, depositos, umbral=0.25):
+    """Ids de clientes cuya asignación es dudosa
+
+    Un cliente está en la frontera si otro depósito está a menos de
+    (1 + umbral) veces la distancia a su depósito asignado.
+    """
+    columnas = np.searchsorted(depositos, asignacion)
+    propia = distancias[np.arange(len(distancias)), columnas]
+    otras = distancias.copy()
+    otras[np.arange(len(distancias)), columnas] = np.inf
+    frontera = otras.min(axis=1) <= (1 + umbral) * propia if len(depositos) > 1 else np.zeros(len(propia), bool)
+    return [problema['clientes'][i]['id'] for i in np.flatnonzero(frontera)]
+
+
+def _distancia(a, b):
+    return int(math.sqrt((a[0] - b[0])**2 + (a[1] - b[1])**2))
+
+
+def distancia_ruta(ruta, posiciones):
+    """Distancia de una ruta (ids o nodos de posiciones) con la misma truncación entera que OR-Tools"""
+    return sum(_distancia(posiciones[a], posiciones[b]) for a, b in zip(ruta, ruta[1:]))
+
+
+def insertar_mas_barato(secuencias, nodo, posiciones, depositos, distancia_maxima=5000):
+    """Insertar un nodo en la posición de menor costo de alguna secuencia
+
+    secuencias: nodos de clientes por vehículo, sin el depósito (se modifica).
+    depositos: nodo de depósito de cada vehículo.
+    Devuelve False si ninguna inserción respeta distancia_maxima.
+    """
+    punto = posiciones[nodo]
+    mejor = None
+    for id_vehiculo, secuencia in enumerate(secuencias):
+        ruta = [depositos[id_vehiculo]] + secuencia + [depositos[id_vehiculo]]
+        largo = distancia_ruta(ruta, posiciones)
+        for posicion in range(1, len(ruta)):
+            previo, siguiente = posiciones[ruta[posicion - 1]], posiciones[ruta[posicion]]
+            costo = _distancia(previo, punto) + _distancia(punto, siguiente) - _distancia(previo, siguiente)
+            if largo + costo <= distancia_maxima and (mejor is None or costo < mejor[0]):
+                mejor = (costo, id_vehiculo, posicion - 1)
+    if mejor is None:
+        return False
+    _, id_vehiculo, posicion = mejor
+    secuencias[id_vehiculo].insert(posicion, nodo)
+    return True
+
+
+def reparar_fronteras(rutas, posiciones, ids_frontera, distancia_maxima=5000, max_pasadas=2):
+    """Mover clientes de frontera a rutas de otro depósito cuando acorta el total
+
+    rutas: lista de rutas de procesar_solucion (se modifica en el lugar).
+    posiciones: {id: (x, y)} de todas las ubicaciones.
+    Devuelve el número de clientes movidos.
+    """
+    movidos = 0
+    frontera = set(ids_frontera)
+    for _ in range(max_pasadas):
+        mejoras = 0
+        for id_cliente in sorted(frontera):
+            origen = next((r for r in rutas if id_cliente in r['ruta'][1:-1]), None)
+            if origen is None:
+                continue
+            ruta_origen = origen['ruta']
+            p = ruta_origen.index(id_cliente)
+            previo, siguiente = posiciones[ruta_origen[p - 1]], posiciones[ruta_origen[p + 1]]
+            cliente = posiciones[id_cliente]
+            ahorro = _distancia(previo, cliente) + _distancia(cliente, siguiente) - _distancia(previo, siguiente)
+
+            mejor = None
+            for destino in rutas:
+                if destino['deposito'] == origen['deposito']:
+                    continue
+                # Costo de insertar en cada arco de la ruta destino, vectorizado
+                puntos = np.array([posiciones[i] for i in destino['ruta']], dtype=np.float64)
+                hacia = np.sqrt(((puntos - cliente)**2).sum(axis=1)).astype(np.int64)
+                arcos = np.sqrt(((puntos[1:] - puntos[:-1])**2).sum(axis=1)).astype(np.int64)
+                costos = hacia[:-1] + hacia[1:] - arcos
+                q = int(np.argmin(costos))
+                costo = int(costos[q])
+                if destino['distancia'] + costo > distancia_maxima:
+                    continue
+                if mejor is None or costo < mejor[0]:
+                    mejor = (costo, destino, q + 1)
+
+            if mejor is not None and mejor[0] < ahorro:
+                costo, destino, posicion = mejor
+                del ruta_origen[p]
+                origen['distancia'] = distancia_ruta(ruta_origen, posiciones)
+                destino['ruta'].insert(posicion, id_cliente)
+                destino['distancia'] = distancia_ruta(destino['ruta'], posiciones)
+                mejoras += 1
+        movidos += mejoras
+        if not mejoras:
+            break
+
+    # Descartar rutas que quedaron vacías (depósito -> depósito)
+    rutas[:] = [r for r in rutas if len(r['ruta']) > 2]
+    return movidos
+
+
+def combinar_soluciones(numero_problema, problema, soluciones_deposito, vehiculos_deposito):
+    """Unir las soluciones por depósito en el formato de procesar_solucion
+
+    Los vehículos locales de cada subproblema se renumeran con los ids
+    globales del modelo completo (id_vehiculo % num_depositos == depósito).
+    """
+    rutas = []
+    for deposito, solucion in sorted(soluciones_deposito.items()):
+        if not solucion:
+            continue
+        ids_globales = vehiculos_deposito[deposito]
+        for ruta in solucion['rutas']:
+            rutas.append(dict(ruta, id_vehiculo=ids_globales[ruta['id_vehiculo']]))
+    rutas.sort(key=lambda r: r['id_vehiculo'])
+    return {
+        'numero_problema': numero_problema,
+        'distancia_total': sum(r['distancia'] for r in rutas),
+        'num_vehiculos_usados': len(rutas),
+        'rutas': rutas,
+        'ubicaciones': problema['depositos'] + problema['clientes'],
+        'num_depositos': problema['num_depositos']
+    }
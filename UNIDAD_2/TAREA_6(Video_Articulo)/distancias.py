@@ -0,0 +1,73 @@
+import numpy as np
+
+# Filas procesadas por bloque; acota la memoria de los temporales a
+# TAMANO_BLOQUE x n x dimension en lugar de n x n x dimension.
+TAMANO_BLOQUE = 512
+
+
+def coordenadas_de(ubicaciones):
+    """Convertir una lista de ubicaciones {'x', 'y', ...} en un arreglo (n, 2)"""
+    coordenadas = np.empty((len(ubicaciones), 2), dtype=np.float64)
+    for i, ubicacion in enumerate(ubicaciones):
+        coordenadas[i, 0] = ubicacion['x']
+        coordenadas[i, 1] = ubicacion['y']
+    return coordenadas
+
+
+def _bloque_distancias(origenes, destinos):
+    """Distancias euclidianas entre dos conjuntos de puntos por broadcasting"""
+    diferencias = origenes[:, None, :] - destinos[None, :, :]
+    return np.sqrt(np.sum(diferencias * diferencias, axis=-1))
+
+
+def calcular_matriz_distancias(coordenadas, dtype=np.float64, escala=None,
+                               simetrica=False, tamano_bloque=TAMANO_BLOQUE):
+    """Calcular la matriz de distancias euclidianas completa entre coordenadas
+
+    coordenadas: arreglo (n, d) con una ubicación por fila.
+    dtype: tipo de la matriz resultante (float32/float64/int32/int64).
+    escala: factor por el que se multiplica cada distancia antes de convertir
+        a entero, para conservar decimales en OR-Tools. Con dtype entero y sin
+        escala se trunca igual que int(distancia).
+    simetrica: calcular solo el triángulo superior por bloques y reflejarlo.
+    """
+    coordenadas = np.ascontiguousarray(coordenadas, dtype=np.float64)
+    if coordenadas.ndim != 2:
+        raise ValueError("Las coordenadas deben tener forma (n, d)")
+
+    dtype = np.dtype(dtype)
+    entero = np.issubdtype(dtype, np.integer)
+    if escala is None:
+        escala = 1
+    n = len(coordenadas)
+    matriz = np.empty((n, n), dtype=dtype)
+
+    def convertir(bloque):
+        if escala != 1:
+            bloque = bloque * escala
+        if entero:
+            # astype trunca hacia cero, igual que int() en el cálculo original
+            return bloque.astype(dtype)
+        return bloque
+
+    for inicio in range(0, n, tamano_bloque):
+        fin = min(inicio + tamano_bloque, n)
+        if simetrica:
+            bloque = convertir(_bloque_distancias(coordenadas[inicio:fin], coordenadas[inicio:]))
+            matriz[inicio:fin, inicio:] = bloque
+            matriz[inicio:, inicio:fin] = bloque.T
+        else:
+            matriz[inicio:fin] = convertir(_bloque_distancias(coordenadas[inicio:fin], coordenadas))
+
+    np.fill_diagonal(matriz, 0)
+    return matriz
+
+
+def registrar_matriz_transito(enrutamiento, matriz):
+    """Registrar la matriz en OR-Tools como tabla de costos nativa
+
+    A diferencia de RegisterTransitCallback, el solver consulta la tabla sin
+    volver al intérprete de Python en cada arco evaluado.
+    """
+    matriz = np.ascontiguousarray(matriz, dtype=np.int64)
+    return enrutamiento.RegisterTransitMatrix(matriz.tolist())
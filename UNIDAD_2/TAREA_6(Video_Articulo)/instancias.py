@@ -0,0 +1,219 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+
+import numpy as np
+
+# Cambiar al modificar el contenido de los .npz para forzar la reconstrucción
+VERSION_FORMATO = 1
+NOMBRE_INDICE = 'indice.json'
+
+
+def hash_archivo(ruta, tamano_bloque=1 << 20):
+    """Calcular el SHA-256 del contenido de un archivo"""
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(tamano_bloque), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def _escribir_atomico(ruta, escribir):
+    """Escribir en un temporal y renombrar para no dejar archivos a medias"""
+    temporal = ruta + '.tmp'
+    with open(temporal, 'wb') as archivo:
+        escribir(archivo)
+    os.replace(temporal, ruta)
+
+
+def problema_a_arreglos(problema):
+    """Convertir un problema (listas de diccionarios) en arreglos NumPy"""
+    depositos = problema['depositos']
+    clientes = problema['clientes']
+    arreglos = {
+        'depositos_xy': np.array([[d['x'], d['y']] for d in depositos]).reshape(-1, 2),
+        'depositos_id': np.array([d['id'] for d in depositos], dtype=str),
+        'clientes_xy': np.array([[c['x'], c['y']] for c in clientes]).reshape(-1, 2),
+        'clientes_id': np.array([c['id'] for c in clientes], dtype=str),
+        'clientes_numero': np.array([c['numero'] for c in clientes], dtype=np.int64),
+        'num_depositos': np.array(problema['num_depositos']),
+    }
+    if clientes and all('demanda' in c for c in clientes):
+        arreglos['clientes_demanda'] = np.array([c['demanda'] for c in clientes])
+    return arreglos
+
+
+def arreglos_a_problema(arreglos):
+    """Reconstruir el diccionario de problema que usa ResolveMDVRP"""
+    depositos = [
+        {'x': x, 'y': y, 'id': id_}
+        for (x, y), id_ in zip(arreglos['depositos_xy'].tolist(), arreglos['depositos_id'].tolist())
+    ]
+    clientes = [
+        {'numero': numero, 'x': x, 'y': y, 'id': id_}
+        for (x, y), id_, numero in zip(arreglos['clientes_xy'].tolist(),
+                                       arreglos['clientes_id'].tolist(),
+                                       arreglos['clientes_numero'].tolist())
+    ]
+    if 'clientes_demanda' in arreglos:
+        for cliente, demanda in zip(clientes, arreglos['clientes_demanda'].tolist()):
+            cliente['demanda'] = demanda
+    return {
+        'depositos': depositos,
+        'clientes': clientes,
+        'num_depositos': int(arreglos['num_depositos'])
+    }
+
+
+class AlmacenInstancias:
+    """Almacén en disco de problemas ya procesados, un .npz por problema
+
+    Los archivos se guardan en un subdirectorio identificado por el hash del
+    libro Excel, así que cualquier cambio en el libro invalida el almacén y
+    se reconstruye en la siguiente carga.
+    """
+
+    def __init__(self, ruta_excel, directorio=None):
+        self.ruta_excel = ruta_excel
+        if directorio is None:
+            directorio = os.path.join(os.path.dirname(os.path.abspath(ruta_excel)), '.cache_mdvrp')
+        self.directorio = directorio
+        self.clave = f"v{VERSION_FORMATO}-{hash_archivo(ruta_excel)}"
+        self.directorio_clave = os.path.join(directorio, self.clave)
+
+    def _ruta_problema(self, numero_problema):
+        return os.path.join(self.directorio_clave, f'problema_{numero_problema}.npz')
+
+    def _ruta_indice(self):
+        return os.path.join(self.directorio_clave, NOMBRE_INDICE)
+
+    def leer_indice(self):
+        """Devolver {numero_problema: valido} o None si el almacén no existe"""
+        try:
+            with open(self._ruta_indice(), encoding='utf-8') as archivo:
+                indice = json.load(archivo)
+        except (OSError, ValueError):
+            return None
+        return {int(numero): valido for numero, valido in indice['problemas'].items()}
+
+    def disponible(self):
+        """Indicar si existe un almacén completo para el libro actual"""
+        return self.leer_indice() is not None
+
+    def contiene(self, numero_problema):
+        """Indicar si el problema ya tiene su .npz en el almacén"""
+        return os.path.exists(self._ruta_problema(numero_problema))
+
+    def cargar(self, numero_problema):
+        """Cargar un problema guardado en el almacén"""
+        with np.load(self._ruta_problema(numero_problema), allow_pickle=False) as datos:
+            return arreglos_a_problema(datos)
+
+    def cargar_todos(self):
+        """Cargar todos los problemas registrados en el índice"""
+        indice = self.leer_indice()
+        if indice is None:
+            return None
+        return {
+            numero: self.cargar(numero) if valido else None
+            for numero, valido in sorted(indice.items())
+        }
+
+    def guardar(self, numero_problema, problema):
+        """Guardar un problema procesado en su propio .npz"""
+        os.makedirs(self.directorio_clave, exist_ok=True)
+        arreglos = problema_a_arreglos(problema)
+        _escribir_atomico(self._ruta_problema(numero_problema),
+                          lambda archivo: np.savez(archivo, **arreglos))
+
+    def guardar_todos(self, problemas):
+        """Guardar todos los problemas y el índice, y borrar almacenes obsoletos"""
+        for numero_problema, problema in problemas.items():
+            if problema is not None:
+                self.guardar(numero_problema, problema)
+
+        # El índice se escribe al final: su presencia marca el almacén como completo
+        indice = {
+            'version': VERSION_FORMATO,
+            'excel': os.path.basename(self.ruta_excel),
+            'problemas': {str(numero): problema is not None for numero, problema in problemas.items()}
+        }
+        os.makedirs(self.directorio_clave, exist_ok=True)
+        _escribir_atomico(self._ruta_indice(),
+                          lambda archivo: archivo.write(json.dumps(indice, indent=2).encode('utf-8')))
+        self.limpiar_obsoletos()
+
+    def limpiar_obsoletos(self):
+        """Eliminar almacenes de versiones anteriores del mismo libro
+
+        Varios libros pueden compartir el directorio: solo se borran los
+        almacenes cuyo índice registra este mismo nombre de libro.
+        """
+        excel = os.path.basename(self.ruta_excel)
+        for nombre in os.listdir(self.directorio):
+            ruta = os.path.join(self.directorio, nombre)
+            if nombre == self.clave or not os.path.isdir(ruta):
+                continue
+            try:
+                with open(os.path.join(ruta, NOMBRE_INDICE), encoding='utf-8') as archivo:
+                    libro = json.load(archivo).get('excel')
+            except (OSError, ValueError, AttributeError):
+                continue  # sin índice legible no se sabe de qué libro es
+            if libro == excel:
+                shutil.rmtree(ruta, ignore_errors=True)
+
+
+class ProblemasPerezosos(Mapping):
+    """Diccionario de problemas que procesa cada uno en su primer acceso
+
+    cargador(numero_problema) devuelve el problema ya procesado. Si se indica
+    max_en_memoria, solo se conservan los problemas usados más recientemente
+    (LRU) y el resto se vuelve a cargar cuando se pida.
+    """
+
+    def __init__(self, numeros, cargador, max_en_memoria=None):
+        if max_en_memoria is not None and max_en_memoria < 1:
+            raise ValueError("max_en_memoria debe ser al menos 1")
+        self._numeros = list(numeros)
+        self._conjunto = set(self._numeros)
+        self._cargador = cargador
+        self.max_en_memoria = max_en_memoria
+        self._cargados = OrderedDict()
+        self._candado = threading.Lock()
+
+    def __getitem__(self, numero_problema):
+        if numero_problema not in self._conjunto:
+            raise KeyError(numero_problema)
+        with self._candado:
+            if numero_problema in self._cargados:
+                self._cargados.move_to_end(numero_problema)
+                return self._cargados[numero_problema]
+
+        problema = self._cargador(numero_problema)
+
+        with self._candado:
+            self._cargados[numero_problema] = problema
+            self._cargados.move_to_end(numero_problema)
+            if self.max_en_memoria is not None:
+                while len(self._cargados) > self.max_en_memoria:
+                    self._cargados.popitem(last=False)
+        return problema
+
+    def __contains__(self, numero_problema):
+        # Sin cargar el problema: basta con que exista la hoja
+        return numero_problema in self._conjunto
+
+    def __iter__(self):
+        return iter(self._numeros)
+
+    def __len__(self):
+        return len(self._numeros)
+
+    def cargados(self):
+        """Números de problema actualmente en memoria, del menos al más reciente"""
+        with self._candado:
+            return list(self._cargados)
@@ -0,0 +1,201 @@
+"""Mejora local de las rutas devueltas por ResolveMDVRP.procesar_solucion
+
+Movimientos: 2-opt y Or-opt dentro de cada ruta (deltas vectorizados sobre
+todas las posiciones) y relocate / exchange entre rutas, limitados a los k
+vecinos más cercanos de cada cliente. Las distancias son las mismas enteras
+que usa OR-Tools, así que 'distancia_total' es comparable. Solo se minimiza
+la distancia total: el costo de balance entre rutas (SetGlobalSpanCostCoefficient)
+no se considera, aunque se respeta el máximo de distancia por ruta.
+"""
+import numpy as np
+
+from distancias import calcular_matriz_distancias, coordenadas_de
+from vecinos import IndiceVecinos
+
+
+class MejoradorRutas:
+    """Estado de las rutas como nodos, con sucesor/predecesor por cliente"""
+
+    def __init__(self, solucion, k_vecinos=10, distancia_maxima=5000, matriz=None, vecinos=None):
+        ubicaciones = solucion['ubicaciones']
+        self.num_depositos = solucion['num_depositos']
+        self.nodos = {ubicacion['id']: nodo for nodo, ubicacion in enumerate(ubicaciones)}
+        self.ids = [ubicacion['id'] for ubicacion in ubicaciones]
+        coordenadas = coordenadas_de(ubicaciones)
+        if matriz is None:
+            matriz = calcular_matriz_distancias(coordenadas, dtype=np.int64, simetrica=True)
+        self.matriz = matriz
+        self.distancia_maxima = distancia_maxima
+        # Vecinos sobre depósitos y clientes, como el índice de construir_modelo
+        if vecinos is None:
+            vecinos = IndiceVecinos(coordenadas, k_vecinos)
+        self.vecinos = vecinos
+
+        self.info = [{k: v for k, v in ruta.items() if k not in ('ruta', 'distancia')}
+                     for ruta in solucion['rutas']]
+        self.rutas = [[self.nodos[id_] for id_ in ruta['ruta']] for ruta in solucion['rutas']]
+        n = len(ubicaciones)
+        self.ruta_de = np.full(n, -1, dtype=np.int64)
+        self.posicion = np.zeros(n, dtype=np.int64)
+        self.anterior = np.zeros(n, dtype=np.int64)
+        self.siguiente = np.zeros(n, dtype=np.int64)
+        self.largos = np.zeros(len(self.rutas), dtype=np.int64)
+        for r in range(len(self.rutas)):
+            self._actualizar(r)
+
+    def _actualizar(self, r):
+        """Recalcular índices y largo de la ruta r tras un movimiento"""
+        ruta = np.asarray(self.rutas[r])
+        clientes = ruta[1:-1]
+        self.ruta_de[clientes] = r
+        self.posicion[clientes] = np.arange(1, len(ruta) - 1)
+        self.anterior[clientes] = ruta[:-2]
+        self.siguiente[clientes] = ruta[2:]
+        self.largos[r] = self.matriz[ruta[:-1], ruta[1:]].sum()
+
+    def dos_opt(self, r):
+        """Mejor inversión de un tramo de la ruta r; True si mejoró"""
+        ruta = np.asarray(self.rutas[r])
+        if len(ruta) < 5:
+            return False
+        m = self.matriz
+        aristas = m[ruta[:-1], ruta[1:]]
+        # delta[i, j]: reemplazar las aristas i y j por (a_i, a_j) y (a_i+1, a_j+1)
+        delta = (m[ruta[:-1, None], ruta[None, :-1]] + m[ruta[1:, None], ruta[None, 1:]]
+                 - aristas[:, None] - aristas[None, :])
+        delta = np.triu(delta, k=2)
+        i, j = np.unravel_index(np.argmin(delta), delta.shape)
+        if delta[i, j] >= 0:
+            return False
+        self.rutas[r][i + 1:j + 1] = self.rutas[r][i + 1:j + 1][::-1]
+        self._actualizar(r)
+        return True
+
+    def or_opt(self, r, max_segmento=3):
+        """Mover un tramo de 1 a max_segmento clientes dentro de la ruta r"""
+        m = self.matriz
+        for largo in range(1, max_segmento + 1):
+            ruta = np.asarray(self.rutas[r])
+            for inicio in range(1, len(ruta) - largo):
+                fin = inicio + largo - 1
+                a, b = ruta[inicio - 1], ruta[fin + 1]
+                primero, ultimo = ruta[inicio], ruta[fin]
+                ahorro = m[a, primero] + m[ultimo, b] - m[a, b]
+                # Aristas (x, y) donde insertar, fuera del tramo y sin tocarlo
+                x = np.concatenate([ruta[:inicio - 1], ruta[fin + 1:-1]])
+                y = np.concatenate([ruta[1:inicio], ruta[fin + 2:]])
+                if len(x) == 0:
+                    continue
+                directo = m[x, primero] + m[ultimo, y] - m[x, y]
+                invertido = m[x, ultimo] + m[primero, y] - m[x, y]
+                costos = np.minimum(directo, invertido)
+                q = int(np.argmin(costos))
+                if costos[q] < ahorro:
+                    tramo = self.rutas[r][inicio:fin + 1]
+                    if invertido[q] < directo[q]:
+                        tramo = tramo[::-1]
+                    resto = self.rutas[r][:inicio] + self.rutas[r][fin + 1:]
+                    destino = resto.index(int(x[q])) + 1
+                    self.rutas[r] = resto[:destino] + tramo + resto[destino:]
+                    self._actualizar(r)
+                    return True
+        return False
+
+    def _vecinos_en_otras_rutas(self, cliente):
+        vecinos = self.vecinos.vecinos(cliente)
+        vecinos = vecinos[vecinos >= self.num_depositos]
+        # ruta_de es -1 para los clientes sin visitar: no tienen posición a la que moverse
+        return vecinos[(self.ruta_de[vecinos] >= 0) & (self.ruta_de[vecinos] != self.ruta_de[cliente])]
+
+    def relocate(self, cliente):
+        """Mover el cliente junto a un vecino de otra ruta"""
+        m = self.matriz
+        vecinos = self._vecinos_en_otras_rutas(cliente)
+        if len(vecinos) == 0:
+            return False
+        a, b = self.anterior[cliente], self.siguiente[cliente]
+        ahorro = m[a, cliente] + m[cliente, b] - m[a, b]
+        # Insertar después o antes de cada vecino, evaluado en bloque
+        sig, ant = self.siguiente[vecinos], self.anterior[vecinos]
+        despues = m[vecinos, cliente] + m[cliente, sig] - m[vecinos, sig]
+        antes = m[ant, cliente] + m[cliente, vecinos] - m[ant, vecinos]
+        costos = np.minimum(despues, antes)
+        costos[self.largos[self.ruta_de[vecinos]] + costos > self.distancia_maxima] = np.iinfo(np.int64).max
+        q = int(np.argmin(costos))
+        if costos[q] >= ahorro:
+            return False
+        vecino = int(vecinos[q])
+        origen, destino = int(self.ruta_de[cliente]), int(self.ruta_de[vecino])
+        self.rutas[origen].remove(cliente)
+        posicion = self.rutas[destino].index(vecino) + (1 if despues[q] <= antes[q] else 0)
+        self.rutas[destino].insert(posicion, cliente)
+        self.ruta_de[cliente] = destino
+        self._actualizar(origen)
+        self._actualizar(destino)
+        return True
+
+    def exchange(self, cliente):
+        """Intercambiar el cliente con un vecino de otra ruta"""
+        m = self.matriz
+        vecinos = self._vecinos_en_otras_rutas(cliente)
+        if len(vecinos) == 0:
+            return False
+        a, b = self.anterior[cliente], self.siguiente[cliente]
+        ant, sig = self.anterior[vecinos], self.siguiente[vecinos]
+        delta_origen = m[a, vecinos] + m[vecinos, b] - m[a, cliente] - m[cliente, b]
+        delta_destino = m[ant, cliente] + m[cliente, sig] - m[ant, vecinos] - m[vecinos, sig]
+        delta = delta_origen + delta_destino
+        factible = ((self.largos[self.ruta_de[cliente]] + delta_origen <= self.distancia_maxima)
+                    & (self.largos[self.ruta_de[vecinos]] + delta_destino <= self.distancia_maxima))
+        delta[~factible] = np.iinfo(np.int64).max
+        q = int(np.argmin(delta))
+        if delta[q] >= 0:
+            return False
+        vecino = int(vecinos[q])
+        origen, destino = int(self.ruta_de[cliente]), int(self.ruta_de[vecino])
+        self.rutas[origen][self.posicion[cliente]] = vecino
+        self.rutas[destino][self.posicion[vecino]] = cliente
+        self._actualizar(origen)
+        self._actualizar(destino)
+        return True
+
+    def mejorar(self, max_pasadas=50):
+        """Aplicar los movimientos hasta que ninguno mejore; devuelve las pasadas hechas"""
+        for pasada in range(1, max_pasadas + 1):
+            mejoro = False
+            for r in range(len(self.rutas)):
+                while self.dos_opt(r) or self.or_opt(r):
+                    mejoro = True
+            for cliente in range(self.num_depositos, len(self.ids)):
+                if self.ruta_de[cliente] < 0:
+                    continue
+                if self.relocate(cliente) or self.exchange(cliente):
+                    mejoro = True
+            if not mejoro:
+                return pasada
+        return max_pasadas
+
+    def solucion(self, original):
+        """Armar una solución con el formato de procesar_solucion"""
+        rutas = [
+            dict(info, ruta=[self.ids[nodo] for nodo in ruta], distancia=int(largo))
+            for info, ruta, largo in zip(self.info, self.rutas, self.largos)
+            if len(ruta) > 2
+        ]
+        return dict(original, rutas=rutas, distancia_total=sum(r['distancia'] for r in rutas),
+                    num_vehiculos_usados=len(rutas))
+
+
+def mejorar_solucion(solucion, k_vecinos=10, distancia_maxima=5000, max_pasadas=50, matriz=None,
+                     vecinos=None):
+    """Pulir una solución de procesar_solucion con búsqueda local
+
+    matriz: matriz entera de distancias ya calculada (se calcula si es None).
+    vecinos: IndiceVecinos de depósitos y clientes ya construido (reemplaza a k_vecinos).
+    Devuelve una solución nueva; la original no se modifica.
+    """
+    if not solucion or not solucion['rutas']:
+        return solucion
+    mejorador = MejoradorRutas(solucion, k_vecinos, distancia_maxima, matriz, vecinos)
+    mejorador.mejorar(max_pasadas)
+    return mejorador.solucion(solucion)
@@ -0,0 +1,112 @@
+import bisect
+import time
+
+# Criterios que puede reportar una corrida en 'criterio_parada'
+CRITERIOS = ('tiempo', 'sin_mejora', 'mejora_relativa', 'soluciones', 'busqueda_completa')
+
+
+class PoliticaParada:
+    """Criterios para detener la búsqueda antes de agotar el tiempo
+
+    tiempo_limite: presupuesto fijo en segundos; si es None se escala con el
+        tamaño: segundos_base + segundos_por_cliente * clientes, acotado a
+        [segundos_minimos, segundos_maximos].
+    sin_mejora_s: detener si el mejor objetivo no mejora durante ese tiempo.
+    mejora_relativa: detener si en los últimos ventana_s segundos el mejor
+        objetivo mejoró menos que esa fracción (p. ej. 0.001 = 0,1 %).
+    max_soluciones: detener tras ese número de soluciones encontradas.
+    """
+
+    def __init__(self, tiempo_limite=None, sin_mejora_s=None, mejora_relativa=None, ventana_s=5,
+                 max_soluciones=None, segundos_base=2, segundos_por_cliente=0.05,
+                 segundos_minimos=1, segundos_maximos=300):
+        self.tiempo_limite = tiempo_limite
+        self.sin_mejora_s = sin_mejora_s
+        self.mejora_relativa = mejora_relativa
+        self.ventana_s = ventana_s
+        self.max_soluciones = max_soluciones
+        self.segundos_base = segundos_base
+        self.segundos_por_cliente = segundos_por_cliente
+        self.segundos_minimos = segundos_minimos
+        self.segundos_maximos = segundos_maximos
+
+    def presupuesto(self, num_clientes):
+        """Tiempo máximo de búsqueda en segundos para una instancia"""
+        if self.tiempo_limite is not None:
+            return self.tiempo_limite
+        segundos = self.segundos_base + self.segundos_por_cliente * num_clientes
+        return min(max(segundos, self.segundos_minimos), self.segundos_maximos)
+
+    def monitor(self, presupuesto):
+        """Crear el estado de una corrida"""
+        return MonitorParada(self, presupuesto)
+
+
+class MonitorParada:
+    """Estado de una corrida: historial de mejoras y criterio que la detuvo"""
+
+    # Los criterios se evalúan como mucho cada INTERVALO segundos; OR-Tools
+    # consulta el límite cientos de miles de veces por segundo
+    INTERVALO = 0.05
+
+    def __init__(self, politica, presupuesto):
+        self.politica = politica
+        self.presupuesto = presupuesto
+        self.soluciones = 0
+        self.tiempos = []
+        self.mejores = []
+        self.criterio = None
+        self.iniciar()
+
+    def iniciar(self):
+        """Poner el reloj en cero justo antes de llamar al solver"""
+        self.inicio = time.perf_counter()
+        self._ultimo_chequeo = self.inicio
+
+    def registrar(self, objetivo):
+        """Anotar una solución encontrada (llamar desde el callback de solución)"""
+        self.soluciones += 1
+        if not self.mejores or objetivo < self.mejores[-1]:
+            self.tiempos.append(time.perf_counter() - self.inicio)
+            self.mejores.append(objetivo)
+
+    def debe_parar(self):
+        """Límite personalizado para OR-Tools: True detiene la búsqueda"""
+        ahora = time.perf_counter()
+        if ahora - self._ultimo_chequeo < self.INTERVALO or not self.mejores:
+            return False
+        self._ultimo_chequeo = ahora
+        transcurrido = ahora - self.inicio
+        politica = self.politica
+
+        if politica.sin_mejora_s is not None and transcurrido - self.tiempos[-1] >= politica.sin_mejora_s:
+            self.criterio = 'sin_mejora'
+            return True
+
+        if politica.mejora_relativa is not None and transcurrido - self.tiempos[0] >= politica.ventana_s:
+            # Mejor objetivo conocido al comienzo de la ventana
+            posicion = bisect.bisect_right(self.tiempos, transcurrido - politica.ventana_s) - 1
+            anterior, actual = self.mejores[max(posicion, 0)], self.mejores[-1]
+            if (anterior - actual) / max(abs(actual), 1) < politica.mejora_relativa:
+                self.criterio = 'mejora_relativa'
+                return True
+        return False
+
+    def criterio_final(self):
+        """Criterio que terminó la corrida, llamado al volver del solver"""
+        if self.criterio is not None:
+            return self.criterio
+        if self.politica.max_soluciones is not None and self.soluciones >= self.politica.max_soluciones:
+            return 'soluciones'
+        if time.perf_counter() - self.inicio >= 0.99 * self.presupuesto:
+            return 'tiempo'
+        return 'busqueda_completa'
+
+    def resumen(self):
+        """Datos de la corrida para agregar a la solución"""
+        return {
+            'criterio_parada': self.criterio_final(),
+            'tiempo_busqueda_s': time.perf_counter() - self.inicio,
+            'tiempo_primera_solucion_s': self.tiempos[0] if self.tiempos else None,
+            'soluciones_encontradas': self.soluciones
+        }
@@ -0,0 +1,50 @@
+"""mejora_rutas no debe mover ni tocar clientes que la solución dejó sin visitar
+
+Uso: python -m pytest test_mejora_rutas.py
+"""
+import numpy as np
+
+from mejora_rutas import MejoradorRutas, mejorar_solucion
+
+
+def _solucion(rng, num_depositos=2, num_clientes=30, sin_visitar=8):
+    """Solución con rutas malas (orden aleatorio) y algunos clientes fuera de toda ruta"""
+    ubicaciones = [{'x': int(x), 'y': int(y), 'id': f'D{i + 1}'}
+                   for i, (x, y) in enumerate(rng.integers(0, 100, (num_depositos, 2)))]
+    ubicaciones += [{'numero': i + 1, 'x': int(x), 'y': int(y), 'id': f'C{i + 1}'}
+                    for i, (x, y) in enumerate(rng.integers(0, 100, (num_clientes, 2)))]
+    clientes = [u['id'] for u in ubicaciones[num_depositos:]]
+    rng.shuffle(clientes)
+    visitados = clientes[sin_visitar:]
+    rutas = []
+    for id_vehiculo in range(num_depositos):
+        deposito = ubicaciones[id_vehiculo]['id']
+        rutas.append({'id_vehiculo': id_vehiculo, 'deposito': deposito,
+                      'ruta': [deposito] + visitados[id_vehiculo::num_depositos] + [deposito],
+                      'distancia': 0})
+    return {'numero_problema': 1, 'ubicaciones': ubicaciones, 'num_depositos': num_depositos,
+            'rutas': rutas, 'distancia_total': 0, 'num_vehiculos_usados': len(rutas)}, clientes[:sin_visitar]
+
+
+def _clientes_en_rutas(solucion):
+    return sorted(id_ for ruta in solucion['rutas'] for id_ in ruta['ruta'][1:-1])
+
+
+def test_sin_visitar_no_son_vecinos_de_otras_rutas():
+    solucion, sin_visitar = _solucion(np.random.default_rng(0))
+    mejorador = MejoradorRutas(solucion, k_vecinos=31)
+    for cliente in range(mejorador.num_depositos, len(mejorador.ids)):
+        if mejorador.ruta_de[cliente] >= 0:
+            vecinos = mejorador._vecinos_en_otras_rutas(cliente)
+            assert not {mejorador.ids[v] for v in vecinos} & set(sin_visitar)
+
+
+def test_pulir_conserva_los_clientes_de_cada_ruta():
+    for semilla in range(20):
+        solucion, sin_visitar = _solucion(np.random.default_rng(semilla))
+        antes = _clientes_en_rutas(solucion)
+        pulida = mejorar_solucion(solucion, k_vecinos=5)
+        assert _clientes_en_rutas(pulida) == antes
+        assert not set(_clientes_en_rutas(pulida)) & set(sin_visitar)
+        for ruta in pulida['rutas']:
+            assert ruta['ruta'][0] == ruta['ruta'][-1] == ruta['deposito']
@@ -0,0 +1,72 @@
+import numpy as np
+
+from distancias import TAMANO_BLOQUE, _bloque_distancias
+
+try:
+    from scipy.spatial import cKDTree
+except ImportError:  # scipy es opcional: se usa búsqueda exhaustiva por bloques
+    cKDTree = None
+
+
+def _vecinos_por_bloques(coordenadas, k, tamano_bloque=TAMANO_BLOQUE):
+    """k vecinos más cercanos sin scipy: O(n²) en tiempo pero O(n·k) en memoria"""
+    n = len(coordenadas)
+    indices = np.empty((n, k), dtype=np.int64)
+    distancias = np.empty((n, k), dtype=np.float64)
+    for inicio in range(0, n, tamano_bloque):
+        fin = min(inicio + tamano_bloque, n)
+        bloque = _bloque_distancias(coordenadas[inicio:fin], coordenadas)
+        filas = np.arange(fin - inicio)
+        bloque[filas, filas + inicio] = np.inf  # excluir el propio punto
+        candidatos = np.argpartition(bloque, k - 1, axis=1)[:, :k]
+        distancias_candidatos = np.take_along_axis(bloque, candidatos, axis=1)
+        orden = np.argsort(distancias_candidatos, axis=1, kind='stable')
+        indices[inicio:fin] = np.take_along_axis(candidatos, orden, axis=1)
+        distancias[inicio:fin] = np.take_along_axis(distancias_candidatos, orden, axis=1)
+    return indices, distancias
+
+
+class IndiceVecinos:
+    """Índice de los k vecinos más cercanos de cada ubicación, en formato CSR
+
+    Se construye una sola vez por instancia (KD-tree si scipy está disponible)
+    y ocupa O(n·k): indptr e indices siguen la convención de
+    scipy.sparse.csr_matrix. Solo guarda la estructura; los costos están en la
+    matriz de distancias.
+    """
+
+    def __init__(self, coordenadas, k):
+        coordenadas = np.ascontiguousarray(coordenadas, dtype=np.float64)
+        n = len(coordenadas)
+        self.coordenadas = coordenadas
+        self.k = min(k, n - 1)
+
+        if self.k <= 0:
+            indices = np.empty((n, 0), dtype=np.int64)
+        elif cKDTree is not None:
+            _, indices = cKDTree(coordenadas).query(coordenadas, k=self.k + 1)
+            # La primera columna es el propio punto (o un duplicado a distancia 0)
+            propio = indices == np.arange(n)[:, None]
+            sin_propio = ~propio
+            sin_propio[propio.sum(axis=1) == 0, -1] = False
+            indices = indices[sin_propio].reshape(n, self.k)
+        else:
+            indices, _ = _vecinos_por_bloques(coordenadas, self.k)
+
+        self.indptr = np.arange(0, n * self.k + 1, self.k, dtype=np.int64) if self.k else np.zeros(n + 1, dtype=np.int64)
+        self.indices = indices.reshape(-1).astype(np.int64)
+
+    def __len__(self):
+        return len(self.coordenadas)
+
+    def vecinos(self, nodo):
+        """Vecinos de un nodo, del más cercano al más lejano"""
+        return self.indices[self.indptr[nodo]:self.indptr[nodo + 1]]
+
+    def vecinos_simetricos(self):
+        """Listas de vecinos cerradas por simetría: j es vecino de i si i lo es de j"""
+        listas = [set(self.vecinos(nodo).tolist()) for nodo in range(len(self))]
+        for nodo in range(len(self)):
+            for vecino in self.vecinos(nodo).tolist():
+                listas[vecino].add(nodo)
+        return [sorted(lista) for lista in listas]